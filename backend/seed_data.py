@@ -1,32 +1,86 @@
 import asyncio
-from motor.motor_asyncio import AsyncIOMotorClient
-from passlib.context import CryptContext
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from pymongo import AsyncMongoClient
+import bcrypt
 import os
 from dotenv import load_dotenv
 from datetime import datetime, timezone, timedelta
-import random
+import numpy as np
 
 load_dotenv()
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Zero-padded suffixes for seed ids: IDX_PAD[i] == f"{i + 1:03d}"
+IDX_PAD = [f"{i:03d}" for i in range(1, 201)]
+
+# MongoDB accepts at most this many documents in one write command
+MAX_WRITE_BATCH = 100_000
+
+# Same bcrypt cost as server.py so seeded logins verify at the same speed
+BCRYPT_ROUNDS = 10
+
+def hash_password(password: str) -> str:
+    # Module-level so it can be pickled and run on a worker process
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode()
+
+async def insert_documents(db, collection: str, docs: list):
+    """
+    Insert seed documents with raw, unacknowledged insert commands
+    """
+    # The seed ids are unique, so reuse them as _id instead of generating ObjectIds
+    documents = [{"_id": doc["id"], **doc} for doc in docs]
+    for start in range(0, len(documents), MAX_WRITE_BATCH):
+        await db.command({
+            "insert": collection,
+            "documents": documents[start:start + MAX_WRITE_BATCH],
+            "ordered": False,
+            "writeConcern": {"w": 0}
+        })
 
 async def seed_database():
     # Connect to MongoDB
     mongo_url = os.environ['MONGO_URL']
-    client = AsyncIOMotorClient(mongo_url)
+    # Pre-warm a few pooled connections for the concurrent seeding phases
+    client = AsyncMongoClient(
+        mongo_url,
+        maxPoolSize=50,
+        minPoolSize=10,
+        compressors="zstd,zlib"
+    )
     db = client[os.environ['DB_NAME']]
     
     print("Seeding database with sample data...")
     
-    # Clear existing data
-    await db.users.delete_many({})
-    await db.profiles.delete_many({})
-    await db.drives.delete_many({})
-    await db.applications.delete_many({})
-    await db.placement_history.delete_many({})
+    # One timestamp for the whole run; per-document precision isn't needed
+    now_dt = datetime.now(timezone.utc)
+    
+    # Random values are drawn in batches up front rather than once per row
+    rng = np.random.default_rng()
+    
+    # bcrypt is CPU-bound, so hash the shared passwords on worker processes
+    # while the collections are being cleared
+    loop = asyncio.get_running_loop()
+    executor = ProcessPoolExecutor()
+    password_hashes = asyncio.gather(*[
+        loop.run_in_executor(executor, hash_password, password)
+        for password in ("tpo123", "hod123", "student123")
+    ])
+    
+    # Clear existing data by dropping the collections outright; they are
+    # recreated on the first insert and indexed once loading is done
+    await asyncio.gather(
+        db.users.drop(),
+        db.profiles.drop(),
+        db.drives.drop(),
+        db.applications.drop(),
+        db.placement_history.drop()
+    )
+    
+    tpo_password, hod_password, student_password = await password_hashes
+    executor.shutdown()
     
     # Create TPO
-    tpo_password = pwd_context.hash("tpo123")
+    user_docs = []
     tpo = {
         "id": "tpo_001",
         "email": "tpo@college.edu",
@@ -34,9 +88,9 @@ async def seed_database():
         "role": "tpo",
         "is_approved": True,
         "password": tpo_password,
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "created_at": now_dt
     }
-    await db.users.insert_one(tpo)
+    user_docs.append(tpo)
     print("Created TPO account: tpo@college.edu / tpo123")
     
     # Create HODs for each department
@@ -44,7 +98,6 @@ async def seed_database():
     hod_names = ["Dr. Priya Sharma", "Dr. Amit Patel", "Dr. Sunita Reddy", "Dr. Vikram Singh", "Dr. Anjali Desai"]
     
     for i, (dept, name) in enumerate(zip(departments, hod_names)):
-        hod_password = pwd_context.hash("hod123")
         hod = {
             "id": f"hod_{dept.lower()}",
             "email": f"hod.{dept.lower()}@college.edu",
@@ -53,9 +106,9 @@ async def seed_database():
             "department": dept,
             "is_approved": True,
             "password": hod_password,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": now_dt
         }
-        await db.users.insert_one(hod)
+        user_docs.append(hod)
         print(f"Created HOD account: hod.{dept.lower()}@college.edu / hod123")
     
     # Create sample students
@@ -79,34 +132,42 @@ async def seed_database():
         ["Cybersecurity", "Ethical Hacking", "Network Security"],
     ]
     
+    # Each skill bucket's resume summary only needs to be joined once
+    joined_top3 = [", ".join(skills[:3]) for skills in skills_pool]
+    cgpas = np.round(rng.uniform(6.5, 9.5, size=len(student_names)), 2).tolist()
+    dept_cycle = itertools.cycle(departments)
+    skills_cycle = itertools.cycle(zip(skills_pool, joined_top3))
+    student_docs = []
+    profile_docs = []
     for i, name in enumerate(student_names):
-        dept = departments[i % len(departments)]
-        student_password = pwd_context.hash("student123")
+        dept = next(dept_cycle)
+        skills, top3 = next(skills_cycle)
         student = {
-            "id": f"student_{i+1:03d}",
+            "id": "student_" + IDX_PAD[i],
             "email": f"student{i+1}@college.edu",
             "name": name,
             "role": "student",
             "department": dept,
             "is_approved": True,
             "password": student_password,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": now_dt
         }
-        await db.users.insert_one(student)
+        student_docs.append(student)
         
         # Create profile
         profile = {
-            "id": f"profile_{i+1:03d}",
+            "id": "profile_" + IDX_PAD[i],
             "user_id": student["id"],
-            "roll_number": f"2021{dept}{i+1:03d}",
-            "cgpa": round(random.uniform(6.5, 9.5), 2),
-            "skills": skills_pool[i % len(skills_pool)],
+            "roll_number": "2021" + dept + IDX_PAD[i],
+            "cgpa": cgpas[i],
+            "skills": skills,
             "resume_url": f"resume_{i+1}.pdf",
-            "resume_text": f"Experienced student with strong skills in {', '.join(skills_pool[i % len(skills_pool)][:3])}",
-            "updated_at": datetime.now(timezone.utc).isoformat()
+            "resume_text": f"Experienced student with strong skills in {top3}",
+            "updated_at": now_dt
         }
-        await db.profiles.insert_one(profile)
+        profile_docs.append(profile)
     
+    user_docs.extend(student_docs)
     print(f"Created {len(student_names)} student accounts (student123 password for all)")
     
     # Create sample placement drives
@@ -118,20 +179,21 @@ async def seed_database():
         {"name": "SecureNet Systems", "role": "Cybersecurity Analyst", "min_cgpa": 7.5, "skills": ["Network Security", "Ethical Hacking"]}
     ]
     
+    drive_docs = []
     for i, company in enumerate(companies):
         drive = {
-            "id": f"drive_{i+1:03d}",
+            "id": "drive_" + IDX_PAD[i],
             "company_name": company["name"],
             "role": company["role"],
             "description": f"Join {company['name']} as a {company['role']}. Work on cutting-edge technologies and grow your career.",
             "min_cgpa": company["min_cgpa"],
             "required_skills": company["skills"],
             "eligible_departments": ["CSE", "ECE", "EEE"],
-            "deadline": (datetime.now(timezone.utc) + timedelta(days=30)).isoformat(),
+            "deadline": now_dt + timedelta(days=30),
             "created_by": "tpo_001",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": now_dt
         }
-        await db.drives.insert_one(drive)
+        drive_docs.append(drive)
     
     print(f"Created {len(companies)} placement drives")
     
@@ -148,47 +210,63 @@ async def seed_database():
     
     current_year = datetime.now().year
     
-    for year in range(current_year - 5, current_year):
-        for dept in departments:
-            # Create 5-8 records per department per year
-            num_records = random.randint(5, 8)
-            for _ in range(num_records):
-                history = {
-                    "id": f"history_{year}_{dept}_{_}",
-                    "year": year,
-                    "department": dept,
-                    "company_name": random.choice(historical_companies),
-                    "role": random.choice(historical_roles),
-                    "students_placed": random.randint(2, 15),
-                    "avg_package": round(random.uniform(3.5, 12.0), 1)
-                }
-                await db.placement_history.insert_one(history)
+    # Create 5-8 records per department per year
+    combos = list(itertools.product(range(current_year - 5, current_year), departments))
+    counts = rng.integers(5, 9, size=len(combos)).tolist()
+    total = sum(counts)
+    companies_idx = rng.integers(0, len(historical_companies), size=total).tolist()
+    roles_idx = rng.integers(0, len(historical_roles), size=total).tolist()
+    placed_arr = rng.integers(2, 16, size=total).tolist()
+    pkg_arr = np.round(rng.uniform(3.5, 12.0, size=total), 1).tolist()
+    
+    records = (
+        (year, dept, n)
+        for (year, dept), count in zip(combos, counts)
+        for n in range(count)
+    )
+    history_docs = [
+        {
+            "id": f"history_{year}_{dept}_{n}",
+            "year": year,
+            "department": dept,
+            "company_name": historical_companies[companies_idx[k]],
+            "role": historical_roles[roles_idx[k]],
+            "students_placed": placed_arr[k],
+            "avg_package": pkg_arr[k]
+        }
+        for k, (year, dept, n) in enumerate(records)
+    ]
     
     print(f"Created 5-year historical placement data")
     
-    # Create some sample applications
-    students = await db.users.find({"role": "student"}).to_list(100)
-    drives = await db.drives.find({}).to_list(100)
+    # Create some sample applications from the documents built above
+    num_apps = 15 * 3
+    ai_scores = np.round(rng.uniform(60, 95, size=num_apps), 2).tolist()
+    applied_days = rng.integers(1, 31, size=num_apps).tolist()
+    selected_days = rng.integers(1, 21, size=(num_apps, 5)).tolist()
+    
+    # Assign different rounds to show progression
+    rounds = ["Applied", "Aptitude", "Coding", "Group Discussion", "HR", "Selected"]
     
-    for i, student in enumerate(students[:15]):  # First 15 students apply
-        for j, drive in enumerate(drives[:3]):  # To first 3 drives
-            profile = await db.profiles.find_one({"user_id": student["id"]})
+    application_docs = []
+    for i, student in enumerate(student_docs[:15]):  # First 15 students apply
+        for j, drive in enumerate(drive_docs[:3]):  # To first 3 drives
+            k = len(application_docs)
             
             # Calculate a simple AI score
-            ai_score = round(random.uniform(60, 95), 2)
+            ai_score = ai_scores[k]
             
-            # Assign different rounds to show progression
-            rounds = ["Applied", "Aptitude", "Coding", "Group Discussion", "HR", "Selected"]
-            current_round = rounds[min(i % 6, len(rounds) - 1)]
+            round_idx = i % len(rounds)
+            current_round = rounds[round_idx]
             
-            round_history = []
-            if current_round != "Applied":
-                round_idx = rounds.index(current_round)
-                for r in rounds[1:round_idx + 1]:
-                    round_history.append({
-                        "round": r,
-                        "selected_at": (datetime.now(timezone.utc) - timedelta(days=random.randint(1, 20))).isoformat()
-                    })
+            # Every round after "Applied" up to the current one; empty for "Applied"
+            round_history = [
+                {
+                    "round": r,
+                    "selected_at": now_dt - timedelta(days=days)
+                }
+                for r, days in zip(rounds[1:round_idx + 1], selected_days[k])
+            ]
             
             application = {
                 "id": f"app_{i}_{j}",
@@ -198,10 +276,35 @@ async def seed_database():
                 "ai_score": ai_score,
                 "current_round": current_round,
                 "round_history": round_history,
-                "applied_at": (datetime.now(timezone.utc) - timedelta(days=random.randint(1, 30))).isoformat()
+                "applied_at": now_dt - timedelta(days=applied_days[k])
             }
-            await db.applications.insert_one(application)
+            application_docs.append(application)
+    
+    # Nothing is read back while seeding, so every collection is written
+    # concurrently without waiting for acknowledgement
+    await asyncio.gather(
+        insert_documents(db, "users", user_docs),
+        insert_documents(db, "profiles", profile_docs),
+        insert_documents(db, "drives", drive_docs),
+        insert_documents(db, "placement_history", history_docs),
+        insert_documents(db, "applications", application_docs)
+    )
     
+    # Build indexes after the bulk load so inserts don't pay for index upkeep.
+    # These match the ones server.py creates on startup
+    await asyncio.gather(
+        db.users.create_index("email", unique=True),
+        db.users.create_index("id", unique=True),
+        db.users.create_index([("role", 1), ("department", 1), ("is_approved", 1)]),
+        db.profiles.create_index("user_id", unique=True),
+        db.applications.create_index([("drive_id", 1), ("student_id", 1)], unique=True),
+        db.applications.create_index("student_id"),
+        db.applications.create_index([("current_round", 1), ("student_id", 1)]),
+        db.applications.create_index("applied_at"),
+        db.drives.create_index("id", unique=True)
+    )
+    # Make sure the server has processed the unacknowledged writes
+    await db.command("ping")
     print(f"Created sample applications")
     
     print("\n=== Database seeded successfully! ===")
@@ -210,7 +313,13 @@ async def seed_database():
     print("HODs: hod.cse@college.edu / hod123 (and similar for other departments)")
     print("Students: student1@college.edu / student123 (student1 to student20)")
     
-    client.close()
+    await client.close()
 
 if __name__ == "__main__":
-    asyncio.run(seed_database())
+    try:
+        import uvloop
+    except ImportError:
+        # uvloop isn't available on Windows; fall back to the default loop
+        asyncio.run(seed_database())
+    else:
+        uvloop.run(seed_database())
@@ -1,22 +1,31 @@
-from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Depends, status
+from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Depends, BackgroundTasks, Query, status
+from fastapi.responses import FileResponse, ORJSONResponse, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
 import os
+from pymongo import AsyncMongoClient, UpdateOne
+from pymongo.errors import DuplicateKeyError
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict, EmailStr
 from typing import List, Optional
 import uuid
+import time
 from datetime import datetime, timezone, timedelta
+from cachetools import TTLCache
 import jwt
-from passlib.context import CryptContext
 import io
+import hashlib
+import aiofiles
 
-from utils.parse_resume import parse_resume_with_ai
-from utils.score_resume import score_resume
-from utils.send_email import send_email
+from utils.passwords import hash_password, verify_password
+from utils.parse_resume import parse_resume_with_ai, NOT_EXTRACTED
+from utils.score_resume import score_resume, score_resumes_batch, normalize_skills
+from utils.send_email import send_emails, close_smtp
 from utils.generate_report import generate_excel_report
 from utils.generate_pdf_report import generate_student_performance_pdf, generate_student_list_pdf
 
@@ -25,22 +34,61 @@ load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncMongoClient(mongo_url, maxPoolSize=100, tz_aware=True)
 db = client[os.environ['DB_NAME']]
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing and checking are deliberately slow CPU work, so they run on
+# a dedicated process pool rather than the loop's default thread pool, which
+# file, database and report work share. Workers are spawned, not forked, so
+# they don't inherit the parent's Mongo client, sockets and threads
+process_pool = ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=multiprocessing.get_context("spawn"))
 
 # JWT settings
 JWT_SECRET = os.environ.get('JWT_SECRET', 'secret_key')
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRATION = timedelta(days=30)
+JWT_EXPIRATION_SECONDS = int(JWT_EXPIRATION.total_seconds())
+_JWT_HEADER = {"alg": JWT_ALGORITHM, "typ": "JWT"}
+
+# Pages fire several API calls with the same token in quick succession, so
+# cache decoded tokens and the users they resolve to. TTLCache is not
+# thread-safe; both are only touched from async dependencies on the event loop
+token_cache = TTLCache(maxsize=10_000, ttl=60)
+user_cache = TTLCache(maxsize=10_000, ttl=5)
+
+# TPO analytics are shared by every dashboard view; writes that change the
+# counts clear this cache
+analytics_cache = TTLCache(maxsize=8, ttl=60)
+
+# Parsed resumes are cached in Mongo by file content hash for this long
+RESUME_CACHE_TTL_SECONDS = 30 * 24 * 60 * 60
+
+# Finished jobs (and any generated file kept on them) expire after this long
+JOB_TTL_SECONDS = 24 * 60 * 60
+
+# Jobs created before this process started can't still be running in it
+STARTED_AT = datetime.now(timezone.utc)
 
 # Security
 security = HTTPBearer()
 
-# Create the main app without a prefix
-app = FastAPI()
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Create the main app without a prefix; responses are serialized with orjson
+app = FastAPI(default_response_class=ORJSONResponse)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_credentials=True,
+    allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -114,40 +162,211 @@ class PlacementHistory(BaseModel):
 
 # ======================== AUTH HELPERS ========================
 
+# Checked against when the email is unknown so failed logins take the same
+# time whether or not the account exists
+_DUMMY_HASH = hash_password("dummy_password_for_timing")
+
 def create_access_token(data: dict):
-    to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + JWT_EXPIRATION
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, JWT_SECRET, algorithm=JWT_ALGORITHM)
+    to_encode = {**data, "exp": int(time.time()) + JWT_EXPIRATION_SECONDS}
+    encoded_jwt = jwt.encode(to_encode, JWT_SECRET, algorithm=JWT_ALGORITHM, headers=_JWT_HEADER)
     return encoded_jwt
 
-def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    token = credentials.credentials
+    payload = token_cache.get(token)
+    if payload and payload["exp"] > time.time():
+        return payload
+    
     try:
-        token = credentials.credentials
         payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        return payload
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
+    
+    token_cache[token] = payload
+    return payload
 
 async def get_current_user(payload: dict = Depends(verify_token)):
-    user = await db.users.find_one({"id": payload["user_id"]}, {"_id": 0})
-    if not user:
+    user = user_cache.get(payload["user_id"])
+    if user:
+        return user
+    
+    user_doc = await db.users.find_one({"id": payload["user_id"]}, {"_id": 0})
+    if not user_doc:
         raise HTTPException(status_code=404, detail="User not found")
-    return User(**user)
+    
+    user = User(**user_doc)
+    user_cache[user.id] = user
+    return user
+
+# ======================== QUERY HELPERS ========================
+
+def lookup_one(collection: str, local_field: str, foreign_field: str, as_field: str) -> list:
+    """
+    Aggregation stages that join at most one document from another collection
+    """
+    return [
+        {"$lookup": {"from": collection, "localField": local_field, "foreignField": foreign_field, "as": as_field}},
+        {"$unwind": {"path": f"${as_field}", "preserveNullAndEmptyArrays": True}}
+    ]
+
+def after_cursor(query: dict, cursor: Optional[str]) -> dict:
+    """
+    Restrict a query to documents after the keyset cursor (the last id of the previous page)
+    """
+    return {**query, "id": {"$gt": cursor}} if cursor else query
+
+def cursor_page(items: list, limit: int) -> dict:
+    """
+    A page of at most limit items and the cursor for the next one (None on the last page);
+    fetch limit + 1 items so a full final page isn't followed by an empty one
+    """
+    page = items[:limit]
+    return {"items": page, "next_cursor": page[-1]["id"] if len(items) > limit else None}
+
+def placed_students_pipeline(department: str) -> list:
+    """
+    Selected applications of a department joined with their student, profile and drive
+    """
+    return [
+        {"$match": {"current_round": "Selected"}},
+        *lookup_one("users", "student_id", "id", "student"),
+        {"$match": {"student.department": department}},
+        *lookup_one("profiles", "student_id", "user_id", "profile"),
+        *lookup_one("drives", "drive_id", "id", "drive"),
+        {"$project": {
+            "_id": 0, "round_history": 0, "student._id": 0, "student.password": 0,
+            "profile._id": 0, "profile.resume_text": 0, "drive._id": 0
+        }}
+    ]
+
+def statistics_2025_pipeline(department: str) -> list:
+    """
+    The department's placed students with company, CGPA bucket and CGPA total breakdowns, as one document
+    """
+    return [
+        *placed_students_pipeline(department),
+        {"$facet": {
+            "students": [
+                {"$project": {
+                    "_id": 0,
+                    "student_id": "$student.id",
+                    "name": "$student.name",
+                    "email": "$student.email",
+                    "roll_number": {"$ifNull": ["$profile.roll_number", "N/A"]},
+                    "cgpa": {"$ifNull": ["$profile.cgpa", 0]},
+                    "company": {"$ifNull": ["$drive.company_name", "N/A"]},
+                    "role": {"$ifNull": ["$drive.role", "N/A"]},
+                    "ai_score": {"$ifNull": ["$ai_score", 0]},
+                    "applied_at": {"$ifNull": ["$applied_at", ""]},
+                    "skills": {"$ifNull": ["$profile.skills", []]}
+                }}
+            ],
+            "by_company": [
+                {"$group": {"_id": {"$ifNull": ["$drive.company_name", "N/A"]}, "count": {"$sum": 1}}},
+                {"$sort": {"count": -1, "_id": 1}}
+            ],
+            "cgpa_buckets": [
+                {"$bucket": {
+                    "groupBy": {"$min": [{"$max": [{"$ifNull": ["$profile.cgpa", 0]}, 0]}, 10]},
+                    "boundaries": [0, 6, 7, 8, 9, 10.01],
+                    "output": {"count": {"$sum": 1}}
+                }}
+            ],
+            "cgpa_total": [
+                {"$group": {"_id": None, "sum": {"$sum": {"$ifNull": ["$profile.cgpa", 0]}}}}
+            ]
+        }}
+    ]
+
+def department_stats_pipeline(departments: list) -> list:
+    """
+    Approved students per department and the Selected applications they hold.
+    Placements of students who are not (or no longer) approved are not counted.
+    """
+    return [
+        {"$match": {"role": "student", "is_approved": True, "department": {"$in": departments}}},
+        # Only the join key, the group key and the round are used downstream
+        {"$project": {"_id": 0, "id": 1, "department": 1}},
+        {"$lookup": {"from": "applications", "localField": "id", "foreignField": "student_id", "as": "apps"}},
+        {"$project": {"department": 1, "apps.current_round": 1}},
+        {"$group": {
+            "_id": "$department",
+            "total": {"$sum": 1},
+            "placed": {"$sum": {"$size": {"$filter": {
+                "input": "$apps",
+                "cond": {"$eq": ["$$this.current_round", "Selected"]}
+            }}}}
+        }}
+    ]
+
+async def aggregate_list(collection, pipeline: list, length: Optional[int] = None) -> list:
+    """
+    Run an aggregation and collect its results (PyMongo's async aggregate returns the cursor from a coroutine)
+    """
+    cursor = await collection.aggregate(pipeline)
+    return await cursor.to_list(length)
+
+# ======================== BACKGROUND JOBS ========================
+
+async def create_job(job_type: str, user_id: str) -> str:
+    """
+    Record a pending job that a client can poll via /jobs/{job_id}
+    """
+    now = datetime.now(timezone.utc)
+    job_id = str(uuid.uuid4())
+    await db.jobs.insert_one({
+        "id": job_id,
+        "type": job_type,
+        "user_id": user_id,
+        "status": "processing",
+        "result": None,
+        "error": None,
+        "created_at": now,
+        "updated_at": now
+    })
+    return job_id
+
+async def run_job(job_id: str, func, *args):
+    """
+    Run a job coroutine and store its outcome on the job document
+    """
+    try:
+        result = await func(*args)
+        update = {"status": "completed", "result": result}
+        # Generated file contents are kept on the job for the download route
+        if "file" in result:
+            update["file"] = result.pop("file")
+    except Exception as e:
+        logger.exception("Job %s failed", job_id)
+        update = {"status": "failed", "error": str(e)}
+    try:
+        await db.jobs.update_one(
+            {"id": job_id},
+            {"$set": update, "$currentDate": {"updated_at": {"$type": "date"}}}
+        )
+    except Exception:
+        # e.g. DocumentTooLarge for a big generated file; don't leave the job processing forever
+        logger.exception("Could not store the result of job %s", job_id)
+        await db.jobs.update_one(
+            {"id": job_id},
+            {"$set": {"status": "failed", "error": "Job result could not be stored"},
+             "$currentDate": {"updated_at": {"$type": "date"}}}
+        )
+
+async def enqueue_job(background_tasks: BackgroundTasks, job_type: str, user_id: str, func, *args) -> dict:
+    job_id = await create_job(job_type, user_id)
+    background_tasks.add_task(run_job, job_id, func, *args)
+    return {"status": "processing", "job_id": job_id}
 
 # ======================== AUTH ROUTES ========================
 
 @api_router.post("/auth/register")
 async def register(user_data: UserRegister):
-    # Check if user exists
-    existing = await db.users.find_one({"email": user_data.email}, {"_id": 0})
-    if existing:
-        raise HTTPException(status_code=400, detail="Email already registered")
-    
     # Create user
-    hashed_password = pwd_context.hash(user_data.password)
+    loop = asyncio.get_running_loop()
+    hashed_password = await loop.run_in_executor(process_pool, hash_password, user_data.password)
     user = User(
         email=user_data.email,
         name=user_data.name,
@@ -157,10 +376,13 @@ async def register(user_data: UserRegister):
     )
     
     user_dict = user.model_dump()
-    user_dict['created_at'] = user_dict['created_at'].isoformat()
     user_dict['password'] = hashed_password
     
-    await db.users.insert_one(user_dict)
+    # The unique email index rejects existing users
+    try:
+        await db.users.insert_one(user_dict)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Email already registered")
     
     token = create_access_token({"user_id": user.id, "role": user.role})
     
@@ -172,10 +394,10 @@ async def register(user_data: UserRegister):
 @api_router.post("/auth/login")
 async def login(credentials: UserLogin):
     user = await db.users.find_one({"email": credentials.email}, {"_id": 0})
-    if not user:
-        raise HTTPException(status_code=401, detail="Invalid credentials")
+    hashed_password = user['password'] if user else _DUMMY_HASH
     
-    if not pwd_context.verify(credentials.password, user['password']):
+    loop = asyncio.get_running_loop()
+    if not await loop.run_in_executor(process_pool, verify_password, credentials.password, hashed_password) or not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     if not user['is_approved'] and user['role'] == 'student':
@@ -208,9 +430,11 @@ async def create_profile(profile_data: dict, current_user: User = Depends(get_cu
     )
     
     profile_dict = profile.model_dump()
-    profile_dict['updated_at'] = profile_dict['updated_at'].isoformat()
     
-    await db.profiles.insert_one(profile_dict)
+    try:
+        await db.profiles.insert_one(profile_dict)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Profile already exists")
     
     return profile
 
@@ -226,7 +450,7 @@ async def get_profile(current_user: User = Depends(get_current_user)):
     return profile
 
 @api_router.post("/students/resume")
-async def upload_resume(file: UploadFile = File(...), current_user: User = Depends(get_current_user)):
+async def upload_resume(background_tasks: BackgroundTasks, file: UploadFile = File(...), current_user: User = Depends(get_current_user)):
     if current_user.role != "student":
         raise HTTPException(status_code=403, detail="Only students can upload resumes")
     
@@ -234,37 +458,56 @@ async def upload_resume(file: UploadFile = File(...), current_user: User = Depen
     if file.content_type not in ["application/pdf", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"]:
         raise HTTPException(status_code=400, detail="Only PDF and DOCX files allowed")
     
-    # Read file
-    content = await file.read()
-    if len(content) > 5 * 1024 * 1024:  # 5MB
+    # Stream file to disk in 1MB chunks, enforcing the size limit and hashing
+    # the content as we go
+    file_path = f"/tmp/{current_user.id}_{file.filename}"
+    size = 0
+    digest = hashlib.sha256()
+    async with aiofiles.open(file_path, "wb") as f:
+        while chunk := await file.read(1024 * 1024):
+            size += len(chunk)
+            if size > 5 * 1024 * 1024:  # 5MB
+                break
+            digest.update(chunk)
+            await f.write(chunk)
+    
+    if size > 5 * 1024 * 1024:
+        os.remove(file_path)
         raise HTTPException(status_code=400, detail="File size must be less than 5MB")
     
-    # Save file
-    file_path = f"/tmp/{current_user.id}_{file.filename}"
-    with open(file_path, "wb") as f:
-        f.write(content)
+    # Parse resume with AI in the background
+    return await enqueue_job(
+        background_tasks, "resume", current_user.id,
+        process_resume, current_user.id, file_path, file.filename, file.content_type, digest.hexdigest()
+    )
+
+async def process_resume(user_id: str, file_path: str, filename: str, content_type: str, content_hash: str) -> dict:
+    # Identical files were already extracted and sent to the LLM; reuse that result
+    resume_data = await db.resume_cache.find_one({"_id": content_hash}, {"_id": 0, "created_at": 0})
+    if not resume_data:
+        resume_data = await parse_resume_with_ai(file_path, content_type)
+        # Basic-extraction fallbacks are not cached so the AI parse is retried next time
+        if resume_data['education'] != NOT_EXTRACTED:
+            await db.resume_cache.update_one(
+                {"_id": content_hash},
+                {"$set": resume_data, "$currentDate": {"created_at": {"$type": "date"}}},
+                upsert=True
+            )
     
-    # Parse resume with AI
-    try:
-        resume_data = await parse_resume_with_ai(file_path, file.content_type)
-        
-        # Update profile
-        await db.profiles.update_one(
-            {"user_id": current_user.id},
-            {"$set": {
-                "resume_url": file.filename,
-                "resume_text": resume_data['text'],
-                "skills": list(set(resume_data.get('skills', []))),
-                "updated_at": datetime.now(timezone.utc).isoformat()
-            }}
-        )
-        
-        return {
-            "message": "Resume uploaded and parsed successfully",
-            "extracted_data": resume_data
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error parsing resume: {str(e)}")
+    # Update profile
+    await db.profiles.update_one(
+        {"user_id": user_id},
+        {"$set": {
+            "resume_url": filename,
+            "resume_text": resume_data['text'],
+            "skills": list(set(resume_data.get('skills', [])))
+        }, "$currentDate": {"updated_at": {"$type": "date"}}}
+    )
+    
+    return {
+        "message": "Resume uploaded and parsed successfully",
+        "extracted_data": resume_data
+    }
 
 # ======================== DRIVES ROUTES ========================
 
@@ -290,10 +533,9 @@ async def create_drive(drive_data: dict, current_user: User = Depends(get_curren
     )
     
     drive_dict = drive.model_dump()
-    drive_dict['created_at'] = drive_dict['created_at'].isoformat()
-    drive_dict['deadline'] = drive_dict['deadline'].isoformat()
     
     await db.drives.insert_one(drive_dict)
+    analytics_cache.clear()
     
     return drive
 
@@ -311,17 +553,17 @@ async def apply_to_drive(application_data: dict, current_user: User = Depends(ge
     if current_user.role != "student":
         raise HTTPException(status_code=403, detail="Only students can apply")
     
-    # Check if already applied
-    existing = await db.applications.find_one({
-        "drive_id": application_data['drive_id'],
-        "student_id": current_user.id
-    })
-    if existing:
-        raise HTTPException(status_code=400, detail="Already applied to this drive")
-    
     # Get profile and drive
-    profile = await db.profiles.find_one({"user_id": current_user.id}, {"_id": 0})
-    drive = await db.drives.find_one({"id": application_data['drive_id']}, {"_id": 0})
+    profile, drive = await asyncio.gather(
+        db.profiles.find_one(
+            {"user_id": current_user.id},
+            {"_id": 0, "resume_text": 1, "skills": 1, "cgpa": 1}
+        ),
+        db.drives.find_one(
+            {"id": application_data['drive_id']},
+            {"_id": 0, "description": 1, "required_skills": 1, "min_cgpa": 1}
+        )
+    )
     
     if not profile:
         raise HTTPException(status_code=400, detail="Please complete your profile first")
@@ -332,7 +574,7 @@ async def apply_to_drive(application_data: dict, current_user: User = Depends(ge
     # Calculate AI score
     ai_score = await score_resume(
         profile.get('resume_text', ''),
-        profile.get('skills', []),
+        normalize_skills(profile.get('skills', [])),
         profile.get('cgpa', 0),
         drive['description'],
         drive['required_skills'],
@@ -346,9 +588,13 @@ async def apply_to_drive(application_data: dict, current_user: User = Depends(ge
     )
     
     app_dict = application.model_dump()
-    app_dict['applied_at'] = app_dict['applied_at'].isoformat()
     
-    await db.applications.insert_one(app_dict)
+    # The unique (drive_id, student_id) index rejects repeat applications
+    try:
+        await db.applications.insert_one(app_dict)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Already applied to this drive")
+    analytics_cache.clear()
     
     return application
 
@@ -357,12 +603,12 @@ async def get_my_applications(current_user: User = Depends(get_current_user)):
     if current_user.role != "student":
         raise HTTPException(status_code=403, detail="Only students can view their applications")
     
-    applications = await db.applications.find({"student_id": current_user.id}, {"_id": 0}).to_list(1000)
-    
     # Enrich with drive data
-    for app in applications:
-        drive = await db.drives.find_one({"id": app['drive_id']}, {"_id": 0})
-        app['drive'] = drive
+    applications = await aggregate_list(db.applications, [
+        {"$match": {"student_id": current_user.id}},
+        *lookup_one("drives", "drive_id", "id", "drive"),
+        {"$project": {"_id": 0, "drive._id": 0}}
+    ], 1000)
     
     return applications
 
@@ -371,24 +617,21 @@ async def get_drive_applications(drive_id: str, current_user: User = Depends(get
     if current_user.role not in ["tpo", "hod"]:
         raise HTTPException(status_code=403, detail="Only TPO/HOD can view applications")
     
-    applications = await db.applications.find({"drive_id": drive_id}, {"_id": 0}).to_list(1000)
-    
-    # Enrich with student data
-    for app in applications:
-        user = await db.users.find_one({"id": app['student_id']}, {"_id": 0})
-        profile = await db.profiles.find_one({"user_id": app['student_id']}, {"_id": 0})
-        app['student'] = user
-        app['profile'] = profile
-    
-    # Sort by AI score
-    applications.sort(key=lambda x: x.get('ai_score', 0), reverse=True)
+    # Enrich with student data and sort by AI score
+    applications = await aggregate_list(db.applications, [
+        {"$match": {"drive_id": drive_id}},
+        *lookup_one("users", "student_id", "id", "student"),
+        *lookup_one("profiles", "student_id", "user_id", "profile"),
+        {"$sort": {"ai_score": -1}},
+        {"$project": {"_id": 0, "student._id": 0, "student.password": 0, "profile._id": 0}}
+    ], 1000)
     
     return applications
 
 # ======================== TPO ROUTES ========================
 
 @api_router.post("/tpo/select-for-round")
-async def select_for_round(selection_data: dict, current_user: User = Depends(get_current_user)):
+async def select_for_round(selection_data: dict, background_tasks: BackgroundTasks, current_user: User = Depends(get_current_user)):
     if current_user.role != "tpo":
         raise HTTPException(status_code=403, detail="Only TPO can select students")
     
@@ -403,50 +646,108 @@ async def select_for_round(selection_data: dict, current_user: User = Depends(ge
     
     selected_emails = []
     
-    for app_id in application_ids:
-        # Update application
-        application = await db.applications.find_one({"id": app_id}, {"_id": 0})
-        if application:
-            round_update = {
-                "round": next_round,
-                "selected_at": datetime.now(timezone.utc).isoformat()
+    applications = await db.applications.find(
+        {"id": {"$in": application_ids}}, {"_id": 0, "id": 1, "student_id": 1}
+    ).to_list(None)
+    if applications:
+        # Update all applications at once
+        round_update = {
+            "round": next_round,
+            "selected_at": datetime.now(timezone.utc)
+        }
+        
+        await db.applications.update_many(
+            {"id": {"$in": [app['id'] for app in applications]}},
+            {
+                "$set": {"current_round": next_round},
+                "$push": {"round_history": round_update}
             }
-            
-            await db.applications.update_one(
-                {"id": app_id},
-                {
-                    "$set": {"current_round": next_round},
-                    "$push": {"round_history": round_update}
-                }
+        )
+        analytics_cache.clear()
+        
+        # Get student emails
+        student_ids = list({app['student_id'] for app in applications})
+        students = {
+            student['id']: student
+            async for student in db.users.find(
+                {"id": {"$in": student_ids}}, {"_id": 0, "id": 1, "email": 1, "name": 1}
             )
-            
-            # Get student email
-            student = await db.users.find_one({"id": application['student_id']}, {"_id": 0})
-            if student:
-                selected_emails.append({
-                    "email": student['email'],
-                    "name": student['name']
-                })
-    
-    # Send emails
-    for student in selected_emails:
-        try:
-            if next_round == "Selected":
-                subject = f"Congratulations! Selected for {drive['role']} at {drive['company_name']}"
-                message = f"Dear {student['name']},\n\nCongratulations! You have been selected for the role of {drive['role']} at {drive['company_name']}.\n\nPlease contact the Training & Placement Office for further details.\n\nBest Regards,\nTraining & Placement Officer"
-            else:
-                subject = f"Selected for {next_round} Round - {drive['company_name']}"
-                message = f"Dear {student['name']},\n\nCongratulations! You have been shortlisted for the {next_round} round for the role of {drive['role']} at {drive['company_name']}.\n\nPlease check your dashboard for further details and schedule.\n\nBest Regards,\nTraining & Placement Officer"
-            
-            await send_email(student['email'], subject, message)
-        except Exception as e:
-            logging.error(f"Error sending email to {student['email']}: {str(e)}")
+        }
+        selected_emails = [
+            {"email": student['email'], "name": student['name']}
+            for app in applications
+            if (student := students.get(app['student_id']))
+        ]
+    
+    def build_email(student: dict):
+        if next_round == "Selected":
+            subject = f"Congratulations! Selected for {drive['role']} at {drive['company_name']}"
+            message = f"Dear {student['name']},\n\nCongratulations! You have been selected for the role of {drive['role']} at {drive['company_name']}.\n\nPlease contact the Training & Placement Office for further details.\n\nBest Regards,\nTraining & Placement Officer"
+        else:
+            subject = f"Selected for {next_round} Round - {drive['company_name']}"
+            message = f"Dear {student['name']},\n\nCongratulations! You have been shortlisted for the {next_round} round for the role of {drive['role']} at {drive['company_name']}.\n\nPlease check your dashboard for further details and schedule.\n\nBest Regards,\nTraining & Placement Officer"
+        return student['email'], subject, message
+    
+    # Send emails after the response, over the shared SMTP session; send_emails
+    # logs and skips any that fail
+    if selected_emails:
+        background_tasks.add_task(send_emails, [build_email(student) for student in selected_emails])
     
     return {
         "message": f"Selected {len(application_ids)} students for {next_round}",
         "emails_sent": len(selected_emails)
     }
 
+@api_router.post("/tpo/drives/{drive_id}/rescore")
+async def rescore_drive(drive_id: str, background_tasks: BackgroundTasks, current_user: User = Depends(get_current_user)):
+    if current_user.role != "tpo":
+        raise HTTPException(status_code=403, detail="Only TPO can rescore applications")
+    
+    if not await db.drives.find_one({"id": drive_id}, {"_id": 1}):
+        raise HTTPException(status_code=404, detail="Drive not found")
+    
+    return await enqueue_job(background_tasks, "rescore-drive", current_user.id, rescore_drive_applications, drive_id)
+
+async def rescore_drive_applications(drive_id: str) -> dict:
+    """
+    Recompute ai_score for every application to a drive with the current scoring, so
+    applications scored before a scoring change rank on the same scale as new ones
+    """
+    drive = await db.drives.find_one(
+        {"id": drive_id},
+        {"_id": 0, "description": 1, "required_skills": 1, "min_cgpa": 1}
+    )
+    if not drive:
+        raise ValueError("Drive not found")
+    
+    applications = await aggregate_list(db.applications, [
+        {"$match": {"drive_id": drive_id}},
+        *lookup_one("profiles", "student_id", "user_id", "profile"),
+        {"$project": {
+            "_id": 0, "id": 1,
+            "profile.resume_text": 1, "profile.skills": 1, "profile.cgpa": 1
+        }}
+    ])
+    if not applications:
+        return {"message": "No applications to rescore", "rescored": 0}
+    
+    profiles = [app.get('profile') or {} for app in applications]
+    scores = await score_resumes_batch(
+        [profile.get('resume_text', '') for profile in profiles],
+        [normalize_skills(profile.get('skills', [])) for profile in profiles],
+        [profile.get('cgpa', 0) for profile in profiles],
+        drive['description'],
+        drive['required_skills'],
+        drive['min_cgpa']
+    )
+    
+    await db.applications.bulk_write([
+        UpdateOne({"id": app['id']}, {"$set": {"ai_score": score}})
+        for app, score in zip(applications, scores)
+    ], ordered=False)
+    
+    return {"message": f"Rescored {len(applications)} applications", "rescored": len(applications)}
+
 @api_router.post("/tpo/reject-applications")
 async def reject_applications(rejection_data: dict, current_user: User = Depends(get_current_user)):
     if current_user.role != "tpo":
@@ -454,28 +755,33 @@ async def reject_applications(rejection_data: dict, current_user: User = Depends
     
     application_ids = rejection_data['application_ids']
     
-    for app_id in application_ids:
-        await db.applications.update_one(
-            {"id": app_id},
-            {"$set": {"current_round": "Rejected"}}
-        )
+    await db.applications.update_many(
+        {"id": {"$in": application_ids}},
+        {"$set": {"current_round": "Rejected"}}
+    )
+    analytics_cache.clear()
     
     return {"message": f"Rejected {len(application_ids)} applications"}
 
 # ======================== HOD ROUTES ========================
 
 @api_router.get("/hod/pending-approvals")
-async def get_pending_approvals(current_user: User = Depends(get_current_user)):
+async def get_pending_approvals(
+    limit: int = Query(1000, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
     if current_user.role != "hod":
         raise HTTPException(status_code=403, detail="Only HOD can view approvals")
     
-    students = await db.users.find({
+    # Keyset pagination: pass a page's next_cursor back as cursor for the next page
+    students = await db.users.find(after_cursor({
         "role": "student",
         "department": current_user.department,
         "is_approved": False
-    }, {"_id": 0}).to_list(1000)
+    }, cursor), {"_id": 0, "password": 0}).sort("id", 1).limit(limit + 1).to_list(None)
     
-    return students
+    return cursor_page(students, limit)
 
 @api_router.post("/hod/approve-student/{student_id}")
 async def approve_student(student_id: str, current_user: User = Depends(get_current_user)):
@@ -486,6 +792,8 @@ async def approve_student(student_id: str, current_user: User = Depends(get_curr
         {"id": student_id, "department": current_user.department},
         {"$set": {"is_approved": True}}
     )
+    user_cache.pop(student_id, None)
+    analytics_cache.clear()
     
     return {"message": "Student approved successfully"}
 
@@ -494,68 +802,65 @@ async def get_hod_statistics(current_user: User = Depends(get_current_user)):
     if current_user.role != "hod":
         raise HTTPException(status_code=403, detail="Only HOD can view statistics")
     
-    # Get 5-year historical data
-    history = await db.placement_history.find({
-        "department": current_user.department
-    }, {"_id": 0}).to_list(1000)
-    
     # Current year stats
     current_year = datetime.now().year
     
-    # Get all students in department
-    total_students = await db.users.count_documents({
-        "role": "student",
-        "department": current_user.department,
-        "is_approved": True
-    })
-    
-    # Get placed students (Selected status)
-    placed_apps = await db.applications.find({
-        "current_round": "Selected"
-    }, {"_id": 0}).to_list(1000)
-    
-    # Filter by department
-    placed_students = []
-    for app in placed_apps:
-        student = await db.users.find_one({"id": app['student_id']}, {"_id": 0})
-        if student and student.get('department') == current_user.department:
-            placed_students.append(app)
+    # 5-year historical data, approved students in the department and
+    # placed students (Selected status) in the department
+    history, total_students, placed = await asyncio.gather(
+        db.placement_history.find({
+            "department": current_user.department
+        }, {"_id": 0}).to_list(1000),
+        db.users.count_documents({
+            "role": "student",
+            "department": current_user.department,
+            "is_approved": True
+        }),
+        aggregate_list(db.applications, [
+            {"$match": {"current_round": "Selected"}},
+            *lookup_one("users", "student_id", "id", "student"),
+            {"$match": {"student.department": current_user.department}},
+            {"$count": "placed"}
+        ], 1)
+    )
+    placed_students = placed[0]['placed'] if placed else 0
     
-    placement_percentage = (len(placed_students) / total_students * 100) if total_students > 0 else 0
+    placement_percentage = (placed_students / total_students * 100) if total_students > 0 else 0
     
     return {
         "department": current_user.department,
         "current_year": current_year,
         "total_students": total_students,
-        "placed_students": len(placed_students),
+        "placed_students": placed_students,
         "placement_percentage": round(placement_percentage, 2),
         "historical_data": history
     }
 
 @api_router.get("/hod/students")
-async def get_department_students(current_user: User = Depends(get_current_user)):
+async def get_department_students(
+    limit: int = Query(1000, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
     if current_user.role != "hod":
         raise HTTPException(status_code=403, detail="Only HOD can view students")
     
-    # Get all students in department
-    students = await db.users.find({
-        "role": "student",
-        "department": current_user.department
-    }, {"_id": 0, "password": 0}).to_list(1000)
-    
-    # Enrich with profile data
-    for student in students:
-        profile = await db.profiles.find_one({"user_id": student['id']}, {"_id": 0})
-        if profile:
-            student['roll_number'] = profile.get('roll_number', 'N/A')
-            student['cgpa'] = profile.get('cgpa', 'N/A')
-            student['skills'] = profile.get('skills', [])
-        else:
-            student['roll_number'] = 'N/A'
-            student['cgpa'] = 'N/A'
-            student['skills'] = []
-    
-    return students
+    # Get a page of students in department (keyset on id), enriched with profile
+    # data; pass a page's next_cursor back as cursor for the next page
+    students = await aggregate_list(db.users, [
+        {"$match": after_cursor({"role": "student", "department": current_user.department}, cursor)},
+        {"$sort": {"id": 1}},
+        {"$limit": limit + 1},
+        *lookup_one("profiles", "id", "user_id", "profile"),
+        {"$addFields": {
+            "roll_number": {"$ifNull": ["$profile.roll_number", "N/A"]},
+            "cgpa": {"$ifNull": ["$profile.cgpa", "N/A"]},
+            "skills": {"$ifNull": ["$profile.skills", []]}
+        }},
+        {"$project": {"_id": 0, "password": 0, "profile": 0}}
+    ])
+    
+    return cursor_page(students, limit)
 
 @api_router.put("/hod/students/{student_id}")
 async def update_student(student_id: str, update_data: dict, current_user: User = Depends(get_current_user)):
@@ -563,7 +868,7 @@ async def update_student(student_id: str, update_data: dict, current_user: User
         raise HTTPException(status_code=403, detail="Only HOD can update students")
     
     # Verify student belongs to HOD's department
-    student = await db.users.find_one({"id": student_id, "department": current_user.department}, {"_id": 0})
+    student = await db.users.find_one({"id": student_id, "department": current_user.department}, {"_id": 1})
     if not student:
         raise HTTPException(status_code=404, detail="Student not found in your department")
     
@@ -575,10 +880,14 @@ async def update_student(student_id: str, update_data: dict, current_user: User
         user_updates['email'] = update_data['email']
     
     if user_updates:
-        await db.users.update_one(
-            {"id": student_id},
-            {"$set": user_updates}
-        )
+        try:
+            await db.users.update_one(
+                {"id": student_id},
+                {"$set": user_updates}
+            )
+        except DuplicateKeyError:
+            raise HTTPException(status_code=400, detail="Email already registered")
+        user_cache.pop(student_id, None)
     
     # Update profile data
     profile_updates = {}
@@ -590,10 +899,9 @@ async def update_student(student_id: str, update_data: dict, current_user: User
         profile_updates['skills'] = update_data['skills']
     
     if profile_updates:
-        profile_updates['updated_at'] = datetime.now(timezone.utc).isoformat()
         await db.profiles.update_one(
             {"user_id": student_id},
-            {"$set": profile_updates}
+            {"$set": profile_updates, "$currentDate": {"updated_at": {"$type": "date"}}}
         )
     
     return {"message": "Student updated successfully"}
@@ -605,79 +913,38 @@ async def get_2025_statistics(current_user: User = Depends(get_current_user)):
     
     current_year = 2025  # Focus on 2025
     
-    # Get all students in department
-    total_students = await db.users.count_documents({
-        "role": "student",
-        "department": current_user.department,
-        "is_approved": True
-    })
-    
-    # Get placed students (Selected status) in 2025
-    placed_apps = await db.applications.find({
-        "current_round": "Selected"
-    }, {"_id": 0}).to_list(1000)
-    
-    # Filter by department and enrich data
-    placed_students_data = []
-    for app in placed_apps:
-        student = await db.users.find_one({"id": app['student_id']}, {"_id": 0})
-        if student and student.get('department') == current_user.department:
-            profile = await db.profiles.find_one({"user_id": app['student_id']}, {"_id": 0})
-            drive = await db.drives.find_one({"id": app['drive_id']}, {"_id": 0})
-            
-            placed_students_data.append({
-                "student_id": student['id'],
-                "name": student['name'],
-                "email": student['email'],
-                "roll_number": profile.get('roll_number', 'N/A') if profile else 'N/A',
-                "cgpa": profile.get('cgpa', 0) if profile else 0,
-                "company": drive.get('company_name', 'N/A') if drive else 'N/A',
-                "role": drive.get('role', 'N/A') if drive else 'N/A',
-                "ai_score": app.get('ai_score', 0),
-                "applied_at": app.get('applied_at', ''),
-                "skills": profile.get('skills', []) if profile else []
-            })
+    # All approved students in the department, alongside the placed students
+    # (Selected status) in 2025 with company, CGPA and average breakdowns
+    total_students, facets = await asyncio.gather(
+        db.users.count_documents({
+            "role": "student",
+            "department": current_user.department,
+            "is_approved": True
+        }),
+        aggregate_list(db.applications, statistics_2025_pipeline(current_user.department), 1)
+    )
+    facets = facets[0]
     
+    placed_students_data = facets['students']
     placement_percentage = (len(placed_students_data) / total_students * 100) if total_students > 0 else 0
     
     # Calculate average CGPA of placed students
-    avg_cgpa_placed = sum(s['cgpa'] for s in placed_students_data if s['cgpa']) / len(placed_students_data) if placed_students_data else 0
+    cgpa_total = facets['cgpa_total'][0]['sum'] if facets['cgpa_total'] else 0
+    avg_cgpa_placed = cgpa_total / len(placed_students_data) if placed_students_data else 0
     
     # Company-wise distribution
-    company_distribution = {}
-    for student in placed_students_data:
-        company = student['company']
-        if company in company_distribution:
-            company_distribution[company] += 1
-        else:
-            company_distribution[company] = 1
-    
-    company_stats = [{"company": k, "count": v} for k, v in company_distribution.items()]
-    company_stats.sort(key=lambda x: x['count'], reverse=True)
+    company_stats = [{"company": c['_id'], "count": c['count']} for c in facets['by_company']]
     
-    # CGPA distribution
+    # CGPA distribution, keyed by each bucket's lower boundary
     cgpa_ranges = {
-        "9.0-10.0": 0,
-        "8.0-8.9": 0,
-        "7.0-7.9": 0,
-        "6.0-6.9": 0,
-        "Below 6.0": 0
+        9: "9.0-10.0",
+        8: "8.0-8.9",
+        7: "7.0-7.9",
+        6: "6.0-6.9",
+        0: "Below 6.0"
     }
-    
-    for student in placed_students_data:
-        cgpa = student['cgpa']
-        if cgpa >= 9.0:
-            cgpa_ranges["9.0-10.0"] += 1
-        elif cgpa >= 8.0:
-            cgpa_ranges["8.0-8.9"] += 1
-        elif cgpa >= 7.0:
-            cgpa_ranges["7.0-7.9"] += 1
-        elif cgpa >= 6.0:
-            cgpa_ranges["6.0-6.9"] += 1
-        else:
-            cgpa_ranges["Below 6.0"] += 1
-    
-    cgpa_distribution = [{"range": k, "count": v} for k, v in cgpa_ranges.items()]
+    bucket_counts = {b['_id']: b['count'] for b in facets['cgpa_buckets']}
+    cgpa_distribution = [{"range": label, "count": bucket_counts.get(lower, 0)} for lower, label in cgpa_ranges.items()]
     
     return {
         "year": current_year,
@@ -692,94 +959,137 @@ async def get_2025_statistics(current_user: User = Depends(get_current_user)):
     }
 
 @api_router.get("/hod/export-report")
-async def export_report(current_user: User = Depends(get_current_user)):
+async def export_report(background_tasks: BackgroundTasks, current_user: User = Depends(get_current_user)):
     if current_user.role != "hod":
         raise HTTPException(status_code=403, detail="Only HOD can export reports")
     
+    return await enqueue_job(background_tasks, "export-report", current_user.id, build_excel_report, current_user.department)
+
+async def build_excel_report(department: str) -> dict:
     # Get placement data
-    placed_apps = await db.applications.find({
-        "current_round": "Selected"
-    }, {"_id": 0}).to_list(1000)
-    
-    # Filter and enrich data
-    report_data = []
-    for app in placed_apps:
-        student = await db.users.find_one({"id": app['student_id']}, {"_id": 0})
-        if student and student.get('department') == current_user.department:
-            profile = await db.profiles.find_one({"user_id": app['student_id']}, {"_id": 0})
-            drive = await db.drives.find_one({"id": app['drive_id']}, {"_id": 0})
-            
-            report_data.append({
-                "Name": student['name'],
-                "Roll Number": profile.get('roll_number', 'N/A'),
-                "CGPA": profile.get('cgpa', 'N/A'),
-                "Company": drive.get('company_name', 'N/A'),
-                "Role": drive.get('role', 'N/A'),
-                "Department": student.get('department', 'N/A')
-            })
-    
-    file_path = await generate_excel_report(report_data, current_user.department)
+    placed_apps = await aggregate_list(db.applications, placed_students_pipeline(department))
+    
+    report_data = [
+        {
+            "Name": app['student']['name'],
+            "Roll Number": app.get('profile', {}).get('roll_number', 'N/A'),
+            "CGPA": app.get('profile', {}).get('cgpa', 'N/A'),
+            "Company": app.get('drive', {}).get('company_name', 'N/A'),
+            "Role": app.get('drive', {}).get('role', 'N/A'),
+            "Department": app['student'].get('department', 'N/A')
+        }
+        for app in placed_apps
+    ]
+    
+    file_path = await generate_excel_report(report_data, department)
     
     return {"message": "Report generated", "file_path": file_path}
 
 @api_router.get("/hod/export-pdf-performance")
-async def export_pdf_performance(current_user: User = Depends(get_current_user)):
+async def export_pdf_performance(background_tasks: BackgroundTasks, current_user: User = Depends(get_current_user)):
     if current_user.role != "hod":
         raise HTTPException(status_code=403, detail="Only HOD can export reports")
     
+    return await enqueue_job(background_tasks, "export-pdf-performance", current_user.id, build_performance_pdf, current_user.department)
+
+async def build_performance_pdf(department: str) -> dict:
     # Get 2025 placement data
-    placed_apps = await db.applications.find({
-        "current_round": "Selected"
-    }, {"_id": 0}).to_list(1000)
-    
-    # Filter and enrich data
-    report_data = []
-    for app in placed_apps:
-        student = await db.users.find_one({"id": app['student_id']}, {"_id": 0})
-        if student and student.get('department') == current_user.department:
-            profile = await db.profiles.find_one({"user_id": app['student_id']}, {"_id": 0})
-            drive = await db.drives.find_one({"id": app['drive_id']}, {"_id": 0})
-            
-            report_data.append({
-                "Name": student['name'],
-                "Roll Number": profile.get('roll_number', 'N/A'),
-                "CGPA": profile.get('cgpa', 'N/A'),
-                "Company": drive.get('company_name', 'N/A'),
-                "Role": drive.get('role', 'N/A'),
-                "Status": "Selected"
-            })
-    
-    file_path = await generate_student_performance_pdf(report_data, current_user.department, 2025)
-    
-    return {"message": "PDF report generated", "file_path": file_path}
+    placed_apps = await aggregate_list(db.applications, placed_students_pipeline(department))
+    
+    report_data = [
+        {
+            "Name": app['student']['name'],
+            "Roll Number": app.get('profile', {}).get('roll_number', 'N/A'),
+            "CGPA": app.get('profile', {}).get('cgpa', 'N/A'),
+            "Company": app.get('drive', {}).get('company_name', 'N/A'),
+            "Role": app.get('drive', {}).get('role', 'N/A'),
+            "Status": "Selected"
+        }
+        for app in placed_apps
+    ]
+    
+    pdf_bytes = await generate_student_performance_pdf(report_data, department, 2025)
+    
+    return {
+        "message": "PDF report generated",
+        "filename": f"student_performance_{department}_2025.pdf",
+        "media_type": "application/pdf",
+        "file": pdf_bytes
+    }
 
 @api_router.get("/hod/export-pdf-students")
-async def export_pdf_students(current_user: User = Depends(get_current_user)):
+async def export_pdf_students(background_tasks: BackgroundTasks, current_user: User = Depends(get_current_user)):
     if current_user.role != "hod":
         raise HTTPException(status_code=403, detail="Only HOD can export reports")
     
+    return await enqueue_job(background_tasks, "export-pdf-students", current_user.id, build_students_pdf, current_user.department)
+
+async def build_students_pdf(department: str) -> dict:
     # Get all students in department
     students = await db.users.find({
         "role": "student",
-        "department": current_user.department
-    }, {"_id": 0, "password": 0}).to_list(1000)
+        "department": department
+    }, {"_id": 0, "password": 0}).to_list(None)
     
     # Enrich with profile data
-    student_data = []
-    for student in students:
-        profile = await db.profiles.find_one({"user_id": student['id']}, {"_id": 0})
-        student_data.append({
+    profiles = {
+        profile['user_id']: profile
+        async for profile in db.profiles.find(
+            {"user_id": {"$in": [student['id'] for student in students]}},
+            {"_id": 0, "user_id": 1, "roll_number": 1, "cgpa": 1, "skills": 1}
+        )
+    }
+    student_data = [
+        {
             "name": student['name'],
             "email": student['email'],
-            "roll_number": profile.get('roll_number', 'N/A') if profile else 'N/A',
-            "cgpa": profile.get('cgpa', 'N/A') if profile else 'N/A',
-            "skills": profile.get('skills', []) if profile else [],
+            "roll_number": profile.get('roll_number', 'N/A'),
+            "cgpa": profile.get('cgpa', 'N/A'),
+            "skills": profile.get('skills', []),
             "is_approved": student.get('is_approved', False)
-        })
+        }
+        for student in students
+        for profile in (profiles.get(student['id'], {}),)
+    ]
     
-    file_path = await generate_student_list_pdf(student_data, current_user.department)
+    pdf_bytes = await generate_student_list_pdf(student_data, department)
     
-    return {"message": "PDF report generated", "file_path": file_path}
+    return {
+        "message": "PDF report generated",
+        "filename": f"student_list_{department}.pdf",
+        "media_type": "application/pdf",
+        "file": pdf_bytes
+    }
+
+# ======================== JOB ROUTES ========================
+
+async def get_own_job(job_id: str, user_id: str, include_file: bool = False) -> dict:
+    projection = {"_id": 0} if include_file else {"_id": 0, "file": 0}
+    job = await db.jobs.find_one({"id": job_id, "user_id": user_id}, projection)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@api_router.get("/jobs/{job_id}")
+async def get_job(job_id: str, current_user: User = Depends(get_current_user)):
+    return await get_own_job(job_id, current_user.id)
+
+@api_router.get("/jobs/{job_id}/download")
+async def download_job_file(job_id: str, current_user: User = Depends(get_current_user)):
+    job = await get_own_job(job_id, current_user.id, include_file=True)
+    result = job.get("result") or {}
+    if job["status"] != "completed" or not ("file" in job or result.get("file_path")):
+        raise HTTPException(status_code=409, detail="Report is not ready")
+    
+    if "file" in job:
+        return StreamingResponse(
+            io.BytesIO(job["file"]),
+            media_type=result["media_type"],
+            headers={"Content-Disposition": f'attachment; filename="{result["filename"]}"'}
+        )
+    
+    file_path = result["file_path"]
+    return FileResponse(file_path, filename=os.path.basename(file_path))
 
 # ======================== ADMIN/TPO ANALYTICS ========================
 
@@ -788,45 +1098,37 @@ async def get_analytics(current_user: User = Depends(get_current_user)):
     if current_user.role != "tpo":
         raise HTTPException(status_code=403, detail="Only TPO can view analytics")
     
-    # Total drives
-    total_drives = await db.drives.count_documents({})
+    cached = analytics_cache.get("stats")
+    if cached:
+        return cached
     
-    # Total applications
-    total_applications = await db.applications.count_documents({})
-    
-    # Placement stats
-    selected_count = await db.applications.count_documents({"current_round": "Selected"})
-    total_students = await db.users.count_documents({"role": "student", "is_approved": True})
+    # Totals, placement counts and department-wise stats are independent, so
+    # run them concurrently. Whole-collection totals come from collection
+    # metadata instead of a count scan
+    departments = ["CSE", "ECE", "EEE", "MECH", "CIVIL"]
+    total_drives, total_applications, selected_count, total_students, dept_rows = await asyncio.gather(
+        db.drives.estimated_document_count(),
+        db.applications.estimated_document_count(),
+        db.applications.count_documents({"current_round": "Selected"}),
+        db.users.count_documents({"role": "student", "is_approved": True}),
+        aggregate_list(db.users, department_stats_pipeline(departments))
+    )
     
     placement_rate = (selected_count / total_students * 100) if total_students > 0 else 0
     
-    # Department-wise stats
-    departments = ["CSE", "ECE", "EEE", "MECH", "CIVIL"]
-    dept_stats = []
-    
-    for dept in departments:
-        dept_students = await db.users.count_documents({
-            "role": "student",
-            "department": dept,
-            "is_approved": True
-        })
-        
-        # Get placed students
-        all_placed = await db.applications.find({"current_round": "Selected"}, {"_id": 0}).to_list(1000)
-        dept_placed = 0
-        for app in all_placed:
-            student = await db.users.find_one({"id": app['student_id']}, {"_id": 0})
-            if student and student.get('department') == dept:
-                dept_placed += 1
-        
-        dept_stats.append({
+    dept_counts = {row['_id']: row for row in dept_rows}
+    dept_stats = [
+        {
             "department": dept,
-            "total": dept_students,
-            "placed": dept_placed,
-            "percentage": round((dept_placed / dept_students * 100) if dept_students > 0 else 0, 2)
-        })
+            "total": counts['total'],
+            "placed": counts['placed'],
+            "percentage": round((counts['placed'] / counts['total'] * 100) if counts['total'] > 0 else 0, 2)
+        }
+        for dept in departments
+        for counts in (dept_counts.get(dept, {"total": 0, "placed": 0}),)
+    ]
     
-    return {
+    analytics = {
         "total_drives": total_drives,
         "total_applications": total_applications,
         "total_students": total_students,
@@ -834,25 +1136,43 @@ async def get_analytics(current_user: User = Depends(get_current_user)):
         "placement_rate": round(placement_rate, 2),
         "department_stats": dept_stats
     }
+    analytics_cache["stats"] = analytics
+    
+    return analytics
 
 # Include the router in the main app
 app.include_router(api_router)
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_credentials=True,
-    allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+@app.on_event("startup")
+async def create_indexes():
+    # Indexes backing the lookups and filters used by the routes above
+    await asyncio.gather(
+        db.users.create_index("email", unique=True),
+        db.users.create_index("id", unique=True),
+        db.users.create_index([("role", 1), ("department", 1), ("is_approved", 1)]),
+        db.profiles.create_index("user_id", unique=True),
+        db.applications.create_index([("drive_id", 1), ("student_id", 1)], unique=True),
+        db.applications.create_index("student_id"),
+        db.applications.create_index([("current_round", 1), ("student_id", 1)]),
+        db.applications.create_index("applied_at"),
+        db.drives.create_index("id", unique=True),
+        db.jobs.create_index("id", unique=True),
+        db.jobs.create_index("created_at", expireAfterSeconds=JOB_TTL_SECONDS),
+        db.resume_cache.create_index("created_at", expireAfterSeconds=RESUME_CACHE_TTL_SECONDS)
+    )
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
+@app.on_event("startup")
+async def fail_interrupted_jobs():
+    # Jobs run as background tasks in this process, so any job still processing
+    # from before it started was interrupted by a restart and will never finish
+    await db.jobs.update_many(
+        {"status": "processing", "created_at": {"$lt": STARTED_AT}},
+        {"$set": {"status": "failed", "error": "Interrupted by a server restart"},
+         "$currentDate": {"updated_at": {"$type": "date"}}}
+    )
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
+    await client.close()
+    process_pool.shutdown()
+    await close_smtp()
@@ -0,0 +1,12 @@
+import bcrypt
+
+BCRYPT_ROUNDS = 10
+
+# Kept apart from server.py so password worker processes, which import this
+# module to unpickle the functions, don't load the whole app
+
+def hash_password(password: str) -> str:
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode()
+
+def verify_password(password: str, hashed_password: str) -> bool:
+    return bcrypt.checkpw(password.encode(), hashed_password.encode())
@@ -0,0 +1,12 @@
+import os
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+
+# server.py reads these at import time; the tests never open a connection
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "placement_portal_test")
+
+# Import server and its utils package the way the backend runs them
+sys.path.insert(0, str(BACKEND_DIR))
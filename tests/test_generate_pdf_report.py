@@ -0,0 +1,43 @@
+import asyncio
+import os
+
+from utils.generate_pdf_report import generate_student_performance_pdf, generate_student_list_pdf
+
+PLACED = [
+    {"Name": "Arjun", "Roll Number": "2021CSE001", "CGPA": 8.5, "Company": "Google", "Role": "SDE", "Status": "Selected"},
+    {"Name": "Priya", "Roll Number": "2021CSE002", "CGPA": "N/A", "Company": "Amazon", "Role": "SDE", "Status": "Selected"},
+]
+STUDENTS = [
+    {"name": "Arjun", "email": "arjun@college.edu", "roll_number": "2021CSE001", "cgpa": 8.5,
+     "skills": ["Python", "React", "SQL", "Docker"], "is_approved": True},
+    {"name": "Priya", "email": "priya@college.edu", "is_approved": False},
+]
+
+
+def test_performance_pdf_returns_bytes():
+    for year in (2025, None):
+        pdf = asyncio.run(generate_student_performance_pdf(PLACED, "CSE", year))
+        assert isinstance(pdf, bytes)
+        assert pdf.startswith(b"%PDF")
+
+
+def test_performance_pdf_without_data():
+    pdf = asyncio.run(generate_student_performance_pdf([], "CSE", 2025))
+
+    assert pdf.startswith(b"%PDF")
+
+
+def test_student_list_pdf_returns_bytes():
+    for students in (STUDENTS, []):
+        pdf = asyncio.run(generate_student_list_pdf(students, "CSE"))
+        assert isinstance(pdf, bytes)
+        assert pdf.startswith(b"%PDF")
+
+
+def test_pdf_written_to_file():
+    path = asyncio.run(generate_student_list_pdf(STUDENTS, "CSE", to_file=True))
+    try:
+        with open(path, "rb") as f:
+            assert f.read(4) == b"%PDF"
+    finally:
+        os.remove(path)
@@ -0,0 +1,34 @@
+import pytest
+from reportlab.pdfgen import canvas
+
+from utils.parse_resume import _extract_pdf_text, _find_common_skills
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Built services in Java and Spring", ["Java"]),
+    ("Frontend work in JavaScript", ["JavaScript"]),
+    ("Java backend, JavaScript frontend", ["Java", "JavaScript"]),
+    ("Systems programming in C++ and C", ["C++"]),
+    ("REST APIs with Node.js, deployed on AWS", ["Node.js", "AWS"]),
+    ("python, DOCKER and machine learning", ["Python", "Docker", "Machine Learning"]),
+    ("Maintained GitHub Actions and TypeScripted tools", []),
+    ("", []),
+])
+def test_find_common_skills(text, expected):
+    assert _find_common_skills(text) == expected
+
+
+def test_find_common_skills_keeps_common_skills_order():
+    assert _find_common_skills("SQL, React, Python, React") == ["Python", "React", "SQL"]
+
+
+def test_extract_pdf_text(tmp_path):
+    pdf_path = tmp_path / "resume.pdf"
+    pdf = canvas.Canvas(str(pdf_path))
+    pdf.drawString(100, 750, "Python developer")
+    pdf.drawString(100, 730, "Skilled in React")
+    pdf.showPage()
+    pdf.drawString(100, 750, "SQL and Docker")
+    pdf.save()
+
+    assert _extract_pdf_text(str(pdf_path)) == "Python developer\nSkilled in React\nSQL and Docker"
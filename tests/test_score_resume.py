@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+from utils.score_resume import MIN_JD_WORDS, score_resume, score_resumes_batch
+
+JOB_DESCRIPTION = "Join Google as a Software Engineer. Work on cutting-edge technologies and grow your career."
+REQUIRED_SKILLS = ["Python", "SQL"]
+
+# (resume_text, skills, cgpa)
+APPLICANTS = [
+    ("Software Engineer at Google working on Python technologies", ["Python", "SQL"], 8.5),
+    ("Chef with ten years of experience", ["Cooking"], 9.2),
+    ("", ["python"], 7.0),
+    (None, None, 6.0),
+    ("Software Engineer", [], 0),
+]
+
+
+def score_batch(applicants, job_description, min_cgpa=7.0):
+    texts, skills, cgpas = zip(*applicants)
+    return asyncio.run(score_resumes_batch(
+        list(texts), list(skills), list(cgpas), job_description, REQUIRED_SKILLS, min_cgpa
+    ))
+
+
+def score_one(applicant, job_description, min_cgpa=7.0):
+    text, skills, cgpa = applicant
+    return asyncio.run(score_resume(text, skills, cgpa, job_description, REQUIRED_SKILLS, min_cgpa))
+
+
+@pytest.mark.parametrize("job_description", [JOB_DESCRIPTION, "Python developer", ""])
+def test_batch_matches_single_scoring(job_description):
+    batch = score_batch(APPLICANTS, job_description)
+    single = [score_one(applicant, job_description) for applicant in APPLICANTS]
+
+    assert batch == single
+    assert all(0 <= score <= 100 for score in batch)
+
+
+def test_matching_resume_scores_higher():
+    matching, unrelated = score_batch(APPLICANTS[:2], JOB_DESCRIPTION)
+
+    assert matching > unrelated
+
+
+def test_missing_resume_text_gets_no_text_score():
+    # Skills 2/2 matched (30) plus CGPA at the minimum (7)
+    assert score_one(("", ["Python", "SQL"], 7.0), JOB_DESCRIPTION) == 37.0
+    assert score_one((None, ["Python", "SQL"], 7.0), JOB_DESCRIPTION) == 37.0
+
+
+def test_short_job_description_uses_full_range():
+    # Without a text score, skills and CGPA are scaled up to cover 0-100
+    assert score_one(("Anything", ["Python", "SQL"], 10.0), "Python developer") == 100.0
+    assert score_one(("Anything", ["Python"], 8.0), "") == 57.5
+
+
+def test_cgpa_below_minimum_is_penalized():
+    # Half the minimum CGPA earns a quarter of the 10 CGPA points
+    assert score_one(("", [], 4.0), JOB_DESCRIPTION, min_cgpa=8.0) == 2.5
+
+
+def baseline_components(applicant, job_description, min_cgpa=7.0):
+    """
+    (text, skills, CGPA) points as scored before short JDs were special-cased
+    """
+    text, skills, cgpa = applicant
+    text_score = 0
+    if job_description:
+        vectorizer = TfidfVectorizer()
+        jd_vector = vectorizer.fit_transform([job_description])
+        text_score = cosine_similarity(vectorizer.transform([text or '']), jd_vector)[0][0] * 60
+    matched = {s.lower() for s in skills or []} & {s.lower() for s in REQUIRED_SKILLS}
+    skills_score = len(matched) / len(REQUIRED_SKILLS) * 30
+    cgpa_score = cgpa if cgpa >= min_cgpa else cgpa / min_cgpa * 5
+    return text_score, skills_score, cgpa_score
+
+
+# Product decision: a JD under MIN_JD_WORDS words gets no text score, and the
+# remaining skills (30) and CGPA (10) points are scaled by 100/40 so those
+# drives rank on the same 0-100 scale. On them skills are worth 75 points and
+# CGPA 25 (instead of 30 and 10), and a drive with no JD can reach 100.
+def test_short_jd_threshold():
+    assert MIN_JD_WORDS == 5
+
+
+@pytest.mark.parametrize("job_description", [JOB_DESCRIPTION, "Senior Python developer with SQL"])
+def test_full_jd_scores_match_baseline(job_description):
+    expected = [min(sum(baseline_components(applicant, job_description)), 100) for applicant in APPLICANTS]
+
+    assert score_batch(APPLICANTS, job_description) == pytest.approx(expected, abs=0.01)
+
+
+@pytest.mark.parametrize("job_description", ["", "Python developer", "Senior Python SQL developer"])
+def test_short_jd_rescales_baseline_skills_and_cgpa(job_description):
+    expected = []
+    for applicant in APPLICANTS:
+        _, skills_score, cgpa_score = baseline_components(applicant, job_description)
+        expected.append(min((skills_score + cgpa_score) * 100 / 40, 100))
+
+    assert score_batch(APPLICANTS, job_description) == pytest.approx(expected, abs=0.01)
+
+
+def test_skills_denominator_counts_case_duplicates():
+    # 2 of the drive's 3 listed skills ("Python" twice), as before skills were normalized
+    score = asyncio.run(score_resume("", ["Python", "SQL"], 7.0, "", ["Python", "python", "SQL"], 7.0))
+
+    assert score == pytest.approx((2 / 3 * 30 + 7.0) * 100 / 40, abs=0.01)
@@ -0,0 +1,156 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+import server
+
+OWNER = server.User(id="student_001", email="student1@college.edu", name="Arjun", role="student")
+OTHER = server.User(id="student_002", email="student2@college.edu", name="Priya", role="student")
+
+
+class FakeJobs:
+    """
+    In-memory stand-in for db.jobs supporting the equality filters and projections the job routes use
+    """
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def find_one(self, query, projection=None):
+        for doc in self.docs:
+            if all(doc.get(key) == value for key, value in query.items()):
+                excluded = {key for key, value in (projection or {}).items() if value == 0}
+                return {key: value for key, value in doc.items() if key not in excluded}
+        return None
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    report = tmp_path / "report.xlsx"
+    report.write_bytes(b"PK excel report")
+    jobs = [
+        {
+            "id": "job_pdf", "user_id": OWNER.id, "status": "completed",
+            "result": {"message": "PDF generated", "filename": "report.pdf", "media_type": "application/pdf"},
+            "error": None, "file": b"%PDF-1.4 report"
+        },
+        {
+            "id": "job_excel", "user_id": OWNER.id, "status": "completed",
+            "result": {"message": "Report generated", "file_path": str(report)}, "error": None
+        },
+        {"id": "job_pending", "user_id": OWNER.id, "status": "processing", "result": None, "error": None},
+    ]
+    monkeypatch.setattr(server, "db", SimpleNamespace(jobs=FakeJobs(jobs)))
+    # No context manager, so startup hooks (index creation) don't run
+    yield TestClient(server.app)
+    server.app.dependency_overrides.clear()
+
+
+def login_as(user):
+    server.app.dependency_overrides[server.get_current_user] = lambda: user
+
+
+def test_after_cursor():
+    query = {"role": "student", "department": "CSE"}
+
+    assert server.after_cursor(query, None) is query
+    assert server.after_cursor(query, "") is query
+    assert server.after_cursor(query, "student_006") == {
+        "role": "student", "department": "CSE", "id": {"$gt": "student_006"}
+    }
+    # The caller's query is left untouched
+    assert "id" not in query
+
+
+def test_cursor_page():
+    students = [{"id": f"student_{i:03}"} for i in range(1, 4)]
+
+    # One more than the limit was fetched, so another page follows
+    assert server.cursor_page(students, 2) == {"items": students[:2], "next_cursor": "student_002"}
+    # A full last page or a short one has no next page
+    assert server.cursor_page(students, 3) == {"items": students, "next_cursor": None}
+    assert server.cursor_page([], 3) == {"items": [], "next_cursor": None}
+
+
+def test_owner_can_read_job_without_file(client):
+    login_as(OWNER)
+    response = client.get("/api/jobs/job_pdf")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "completed"
+    assert "file" not in response.json()
+
+
+def test_owner_can_download_job_file(client):
+    login_as(OWNER)
+    response = client.get("/api/jobs/job_pdf/download")
+
+    assert response.status_code == 200
+    assert response.content == b"%PDF-1.4 report"
+    assert response.headers["content-type"] == "application/pdf"
+    assert 'filename="report.pdf"' in response.headers["content-disposition"]
+
+
+def test_owner_can_download_report_file(client):
+    login_as(OWNER)
+    response = client.get("/api/jobs/job_excel/download")
+
+    assert response.status_code == 200
+    assert response.content == b"PK excel report"
+    assert 'filename="report.xlsx"' in response.headers["content-disposition"]
+
+
+def test_unfinished_job_cannot_be_downloaded(client):
+    login_as(OWNER)
+
+    assert client.get("/api/jobs/job_pending/download").status_code == 409
+
+
+@pytest.mark.parametrize("path", ["/api/jobs/job_pdf", "/api/jobs/job_pdf/download", "/api/jobs/missing"])
+def test_other_users_cannot_see_job(client, path):
+    login_as(OTHER)
+
+    assert client.get(path).status_code == 404
+
+
+class FakeApplications:
+    """
+    Records the bulk writes made to db.applications
+    """
+    def __init__(self):
+        self.writes = []
+
+    async def bulk_write(self, requests, ordered=True):
+        self.writes.extend(requests)
+
+
+def test_rescore_updates_every_application_with_current_scoring(monkeypatch):
+    drive = {"description": "Python developer", "required_skills": ["Python", "SQL"], "min_cgpa": 7.0}
+    applications = [
+        {"id": "app_1", "profile": {"resume_text": "Python and SQL", "skills": ["python", "SQL"], "cgpa": 8.0}},
+        {"id": "app_2", "profile": {"skills": ["Java"], "cgpa": 6.0}},
+        {"id": "app_3"},
+    ]
+
+    class FakeDrives:
+        async def find_one(self, query, projection=None):
+            return drive
+
+    async def fake_aggregate_list(collection, pipeline, length=None):
+        return applications
+
+    written = FakeApplications()
+    monkeypatch.setattr(server, "db", SimpleNamespace(drives=FakeDrives(), applications=written))
+    monkeypatch.setattr(server, "aggregate_list", fake_aggregate_list)
+
+    result = asyncio.run(server.rescore_drive_applications("drive_001"))
+
+    expected = asyncio.run(server.score_resumes_batch(
+        ["Python and SQL", "", ""], [["python", "SQL"], ["Java"], []], [8.0, 6.0, 0],
+        drive["description"], drive["required_skills"], drive["min_cgpa"]
+    ))
+    assert result["rescored"] == 3
+    assert [(op._filter, op._doc) for op in written.writes] == [
+        ({"id": app["id"]}, {"$set": {"ai_score": score}}) for app, score in zip(applications, expected)
+    ]
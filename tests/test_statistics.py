@@ -0,0 +1,240 @@
+import asyncio
+from types import SimpleNamespace
+
+import mongomock
+import pytest
+
+import server
+
+HOD = server.User(id="hod_cse", email="hod.cse@college.edu", name="HOD", role="hod", department="CSE")
+TPO = server.User(id="tpo_001", email="tpo@college.edu", name="TPO", role="tpo")
+
+# CGPA edge values for placed CSE students; None means the profile has no cgpa
+CGPAS = [0, 5.99, 6.0, 6.99, 7.0, 8.95, 9.0, 9.99, 10.0, 10.5, -1, None]
+
+
+class AsyncCollection:
+    """
+    Async face over a mongomock collection for the calls the statistics routes make
+    """
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def count_documents(self, query):
+        return self.collection.count_documents(query)
+
+    async def estimated_document_count(self):
+        return self.collection.estimated_document_count()
+
+    async def aggregate(self, pipeline):
+        documents = list(self.collection.aggregate(pipeline))
+
+        class Cursor:
+            async def to_list(self, length=None):
+                return documents[:length] if length else documents
+
+        return Cursor()
+
+
+def seed(database):
+    users, profiles, applications = [], [], []
+    for i, cgpa in enumerate(CGPAS):
+        users.append({
+            "id": f"cse_{i:02}", "email": f"cse{i}@college.edu", "name": f"CSE {i}",
+            "role": "student", "department": "CSE", "is_approved": i % 4 != 3
+        })
+        profile = {"user_id": f"cse_{i:02}", "roll_number": f"CSE{i:03}", "skills": ["Python"]}
+        if cgpa is not None:
+            profile["cgpa"] = cgpa
+        profiles.append(profile)
+        applications.append({
+            "id": f"app_{i:02}", "student_id": f"cse_{i:02}", "drive_id": f"drive_{i % 3}",
+            "current_round": "Selected", "ai_score": 50 + i, "applied_at": f"2025-01-{i + 1:02}"
+        })
+    # A student without a profile, placed through a drive that no longer exists
+    users.append({
+        "id": "cse_no_profile", "email": "np@college.edu", "name": "No Profile",
+        "role": "student", "department": "CSE", "is_approved": True
+    })
+    applications.append({"id": "app_np", "student_id": "cse_no_profile", "drive_id": "drive_gone", "current_round": "Selected"})
+    # Applications that must not count: another department, and not selected
+    users.append({"id": "ece_00", "email": "ece@college.edu", "name": "ECE", "role": "student", "department": "ECE", "is_approved": True})
+    profiles.append({"user_id": "ece_00", "cgpa": 9.5})
+    applications.append({"id": "app_ece", "student_id": "ece_00", "drive_id": "drive_0", "current_round": "Selected"})
+    applications.append({"id": "app_hr", "student_id": "cse_00", "drive_id": "drive_1", "current_round": "HR"})
+    users.append({"id": "cse_pending", "email": "p@college.edu", "name": "P", "role": "student", "department": "CSE", "is_approved": False})
+
+    database.users.insert_many(users)
+    database.profiles.insert_many(profiles)
+    database.applications.insert_many(applications)
+    database.drives.insert_many([
+        {"id": "drive_0", "company_name": "Google", "role": "SDE"},
+        {"id": "drive_1", "company_name": "Amazon", "role": "SDE"},
+        {"id": "drive_2", "company_name": "Microsoft", "role": "SWE"},
+    ])
+
+
+def find_one(collection, query):
+    document = collection.find_one(query, {"_id": 0})
+    return dict(document) if document else None
+
+
+def baseline_2025_statistics(database, department):
+    """
+    The per-application loop get_2025_statistics ran before it became one aggregation
+    """
+    total_students = database.users.count_documents({"role": "student", "department": department, "is_approved": True})
+    placed_students_data = []
+    for app in database.applications.find({"current_round": "Selected"}, {"_id": 0}):
+        student = find_one(database.users, {"id": app['student_id']})
+        if student and student.get('department') == department:
+            profile = find_one(database.profiles, {"user_id": app['student_id']})
+            drive = find_one(database.drives, {"id": app['drive_id']})
+            placed_students_data.append({
+                "student_id": student['id'],
+                "name": student['name'],
+                "email": student['email'],
+                "roll_number": profile.get('roll_number', 'N/A') if profile else 'N/A',
+                "cgpa": profile.get('cgpa', 0) if profile else 0,
+                "company": drive.get('company_name', 'N/A') if drive else 'N/A',
+                "role": drive.get('role', 'N/A') if drive else 'N/A',
+                "ai_score": app.get('ai_score', 0),
+                "applied_at": app.get('applied_at', ''),
+                "skills": profile.get('skills', []) if profile else []
+            })
+
+    placement_percentage = (len(placed_students_data) / total_students * 100) if total_students > 0 else 0
+    avg_cgpa_placed = sum(s['cgpa'] for s in placed_students_data if s['cgpa']) / len(placed_students_data) if placed_students_data else 0
+
+    company_distribution = {}
+    for student in placed_students_data:
+        company_distribution[student['company']] = company_distribution.get(student['company'], 0) + 1
+    company_stats = [{"company": k, "count": v} for k, v in company_distribution.items()]
+    company_stats.sort(key=lambda x: x['count'], reverse=True)
+
+    cgpa_ranges = {"9.0-10.0": 0, "8.0-8.9": 0, "7.0-7.9": 0, "6.0-6.9": 0, "Below 6.0": 0}
+    for student in placed_students_data:
+        cgpa = student['cgpa']
+        if cgpa >= 9.0:
+            cgpa_ranges["9.0-10.0"] += 1
+        elif cgpa >= 8.0:
+            cgpa_ranges["8.0-8.9"] += 1
+        elif cgpa >= 7.0:
+            cgpa_ranges["7.0-7.9"] += 1
+        elif cgpa >= 6.0:
+            cgpa_ranges["6.0-6.9"] += 1
+        else:
+            cgpa_ranges["Below 6.0"] += 1
+
+    return {
+        "year": 2025,
+        "department": department,
+        "total_students": total_students,
+        "placed_students": len(placed_students_data),
+        "placement_percentage": round(placement_percentage, 2),
+        "avg_cgpa_placed": round(avg_cgpa_placed, 2),
+        "placed_students_details": placed_students_data,
+        "company_distribution": company_stats,
+        "cgpa_distribution": [{"range": k, "count": v} for k, v in cgpa_ranges.items()]
+    }
+
+
+def baseline_analytics(database):
+    """
+    The per-department loop get_analytics ran before it became one aggregation
+    """
+    total_students = database.users.count_documents({"role": "student", "is_approved": True})
+    selected_count = database.applications.count_documents({"current_round": "Selected"})
+    placement_rate = (selected_count / total_students * 100) if total_students > 0 else 0
+
+    dept_stats = []
+    for dept in ["CSE", "ECE", "EEE", "MECH", "CIVIL"]:
+        dept_students = database.users.count_documents({"role": "student", "department": dept, "is_approved": True})
+        dept_placed = 0
+        for app in database.applications.find({"current_round": "Selected"}, {"_id": 0}):
+            student = find_one(database.users, {"id": app['student_id']})
+            if student and student.get('department') == dept:
+                dept_placed += 1
+        dept_stats.append({
+            "department": dept,
+            "total": dept_students,
+            "placed": dept_placed,
+            "percentage": round((dept_placed / dept_students * 100) if dept_students > 0 else 0, 2)
+        })
+
+    return {
+        "total_drives": database.drives.count_documents({}),
+        "total_applications": database.applications.count_documents({}),
+        "total_students": total_students,
+        "placed_students": selected_count,
+        "placement_rate": round(placement_rate, 2),
+        "department_stats": dept_stats
+    }
+
+
+@pytest.fixture
+def database(monkeypatch):
+    database = mongomock.MongoClient().placement_portal_test
+    seed(database)
+    monkeypatch.setattr(server, "db", SimpleNamespace(
+        users=AsyncCollection(database.users),
+        applications=AsyncCollection(database.applications),
+        drives=AsyncCollection(database.drives)
+    ))
+    server.analytics_cache.clear()
+    yield database
+    server.analytics_cache.clear()
+
+
+def by_student(details):
+    return sorted(details, key=lambda s: s['student_id'])
+
+
+def test_2025_statistics_match_baseline(database):
+    expected = baseline_2025_statistics(database, "CSE")
+    actual = asyncio.run(server.get_2025_statistics(current_user=HOD))
+
+    assert by_student(actual.pop("placed_students_details")) == by_student(expected.pop("placed_students_details"))
+    # Companies with equal counts are now ordered by name instead of first appearance
+    assert actual.pop("company_distribution") == sorted(expected.pop("company_distribution"), key=lambda c: (-c['count'], c['company']))
+    assert actual == expected
+
+
+def test_2025_cgpa_buckets_clamp_edge_values(database):
+    distribution = asyncio.run(server.get_2025_statistics(current_user=HOD))["cgpa_distribution"]
+
+    assert {d['range']: d['count'] for d in distribution} == {
+        # 9.0, 9.99, 10.0 and 10.5 (clamped to 10, inside the 10.01 boundary)
+        "9.0-10.0": 4,
+        "8.0-8.9": 1,
+        "7.0-7.9": 1,
+        "6.0-6.9": 2,
+        # 0, 5.99, -1 (clamped to 0), and the missing CGPA and profile
+        "Below 6.0": 5
+    }
+
+
+def test_analytics_match_baseline_for_approved_students(database):
+    # Department placements now count approved students only; drop the
+    # unapproved students' placements so the old loop counts the same thing
+    unapproved = [user['id'] for user in database.users.find({"is_approved": False})]
+    placed_unapproved = database.applications.count_documents({"student_id": {"$in": unapproved}, "current_round": "Selected"})
+    assert placed_unapproved == 3
+    actual = asyncio.run(server.get_analytics(current_user=TPO))
+
+    database.applications.delete_many({"student_id": {"$in": unapproved}, "current_round": "Selected"})
+    expected = baseline_analytics(database)
+
+    assert actual["department_stats"] == expected["department_stats"]
+    # Whole-portal totals still count every application
+    assert actual["placed_students"] == expected["placed_students"] + placed_unapproved
+    assert actual["total_applications"] == expected["total_applications"] + placed_unapproved
+    assert actual["total_drives"] == expected["total_drives"]
+    assert actual["total_students"] == expected["total_students"]
+
+
+def test_analytics_department_placements_skip_unapproved_students(database):
+    cse = asyncio.run(server.get_analytics(current_user=TPO))["department_stats"][0]
+
+    # 13 placed CSE students, 3 of whom are not approved
+    assert cse == {"department": "CSE", "total": 10, "placed": 10, "percentage": 100.0}
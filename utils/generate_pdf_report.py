@@ -5,46 +5,106 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
 from datetime import datetime
+from functools import lru_cache
+import asyncio
+import io
 import os
+import numpy as np
 
-async def generate_student_performance_pdf(data: list, department: str, year: int = None) -> str:
+# Styles are stateless, so build them once and share them across reports
+_STYLES = getSampleStyleSheet()
+_TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=_STYLES['Heading1'],
+    fontSize=24,
+    textColor=colors.HexColor('#1e40af'),
+    spaceAfter=30,
+    alignment=TA_CENTER
+)
+_HEADING_STYLE = ParagraphStyle(
+    'CustomHeading',
+    parent=_STYLES['Heading2'],
+    fontSize=16,
+    textColor=colors.HexColor('#374151'),
+    spaceAfter=12,
+    spaceBefore=12
+)
+_PERFORMANCE_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3b82f6')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 9),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f3f4f6')])
+])
+_SUMMARY_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#10b981')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 11)
+])
+_STUDENT_LIST_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3b82f6')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 9),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 8),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f3f4f6')])
+])
+
+@lru_cache(maxsize=1024)
+def _fmt_skills(skills: tuple) -> str:
+    """
+    First three skills for the student list table, with an ellipsis when there are more
+    """
+    skills_str = ', '.join(skills[:3])
+    if len(skills) > 3:
+        skills_str += '...'
+    return skills_str or 'N/A'
+
+
+async def generate_student_performance_pdf(data: list, department: str, year: int = None, to_file: bool = False) -> bytes | str:
     """
-    Generate PDF report for student performance
+    Generate PDF report for student performance, returned as bytes (or written to /tmp when to_file is set)
     """
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    year_str = f"_{year}" if year else ""
-    filename = f"student_performance_{department}{year_str}_{timestamp}.pdf"
-    filepath = f"/tmp/{filename}"
+    # reportlab rendering is synchronous, so keep it off the event loop
+    return await asyncio.to_thread(_render_student_performance_pdf, data, department, year, to_file)
+
+
+def _render_student_performance_pdf(data: list, department: str, year: int = None, to_file: bool = False) -> bytes | str:
+    if to_file:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        year_str = f"_{year}" if year else ""
+        filename = f"student_performance_{department}{year_str}_{timestamp}.pdf"
+        output = f"/tmp/{filename}"
+    else:
+        output = io.BytesIO()
     
     # Create PDF
-    doc = SimpleDocTemplate(filepath, pagesize=A4)
+    doc = SimpleDocTemplate(output, pagesize=A4)
     elements = []
     
-    # Styles
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#1e40af'),
-        spaceAfter=30,
-        alignment=TA_CENTER
-    )
-    
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=16,
-        textColor=colors.HexColor('#374151'),
-        spaceAfter=12,
-        spaceBefore=12
-    )
-    
     # Title
     title_text = f"Student Performance Report - {department} Department"
     if year:
         title_text += f" ({year})"
-    title = Paragraph(title_text, title_style)
+    title = Paragraph(title_text, _TITLE_STYLE)
     elements.append(title)
     elements.append(Spacer(1, 0.2*inch))
     
@@ -52,20 +112,19 @@ async def generate_student_performance_pdf(data: list, department: str, year: in
     report_info = Paragraph(
         f"Generated on: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}<br/>"
         f"Total Students: {len(data)}",
-        styles['Normal']
+        _STYLES['Normal']
     )
     elements.append(report_info)
     elements.append(Spacer(1, 0.3*inch))
     
     if len(data) == 0:
-        no_data = Paragraph("No student data available for this report.", styles['Normal'])
+        no_data = Paragraph("No student data available for this report.", _STYLES['Normal'])
         elements.append(no_data)
     else:
         # Table data
-        table_data = [['S.No', 'Name', 'Roll Number', 'CGPA', 'Company', 'Role', 'Status']]
-        
-        for idx, student in enumerate(data, 1):
-            table_data.append([
+        header = ['S.No', 'Name', 'Roll Number', 'CGPA', 'Company', 'Role', 'Status']
+        table_data = [header] + [
+            [
                 str(idx),
                 student.get('Name', 'N/A'),
                 student.get('Roll Number', 'N/A'),
@@ -73,23 +132,13 @@ async def generate_student_performance_pdf(data: list, department: str, year: in
                 student.get('Company', 'N/A'),
                 student.get('Role', 'N/A'),
                 student.get('Status', 'N/A')
-            ])
+            ]
+            for idx, student in enumerate(data, 1)
+        ]
         
         # Create table
         table = Table(table_data, colWidths=[0.6*inch, 1.5*inch, 1.2*inch, 0.8*inch, 1.5*inch, 1.5*inch, 1*inch])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3b82f6')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f3f4f6')])
-        ]))
+        table.setStyle(_PERFORMANCE_TABLE_STYLE)
         
         elements.append(table)
         elements.append(Spacer(1, 0.3*inch))
@@ -97,12 +146,14 @@ async def generate_student_performance_pdf(data: list, department: str, year: in
         # Summary Statistics
         if year:
             elements.append(PageBreak())
-            summary_title = Paragraph("Summary Statistics", heading_style)
+            summary_title = Paragraph("Summary Statistics", _HEADING_STYLE)
             elements.append(summary_title)
             elements.append(Spacer(1, 0.2*inch))
             
-            placed_count = sum(1 for s in data if s.get('Status') == 'Selected')
-            avg_cgpa = sum(float(s.get('CGPA', 0)) for s in data if s.get('CGPA', 0) != 'N/A') / len(data) if data else 0
+            # Average is taken over all rows; rows without a CGPA count as zero
+            placed_count = int(np.fromiter((s.get('Status') == 'Selected' for s in data), dtype=np.bool_, count=len(data)).sum())
+            cgpas = np.fromiter((float(s['CGPA']) for s in data if s.get('CGPA') not in (None, 'N/A')), dtype=np.float64)
+            avg_cgpa = float(cgpas.sum()) / len(data) if data else 0
             
             summary_data = [
                 ['Metric', 'Value'],
@@ -113,52 +164,38 @@ async def generate_student_performance_pdf(data: list, department: str, year: in
             ]
             
             summary_table = Table(summary_data, colWidths=[3*inch, 2*inch])
-            summary_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#10b981')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 1), (-1, -1), 11)
-            ]))
+            summary_table.setStyle(_SUMMARY_TABLE_STYLE)
             
             elements.append(summary_table)
     
     # Build PDF
     doc.build(elements)
     
-    return filepath
+    return output if to_file else output.getvalue()
 
 
-async def generate_student_list_pdf(students: list, department: str) -> str:
+async def generate_student_list_pdf(students: list, department: str, to_file: bool = False) -> bytes | str:
     """
-    Generate PDF report for student list with details
+    Generate PDF report for student list with details, returned as bytes (or written to /tmp when to_file is set)
     """
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"student_list_{department}_{timestamp}.pdf"
-    filepath = f"/tmp/{filename}"
+    # reportlab rendering is synchronous, so keep it off the event loop
+    return await asyncio.to_thread(_render_student_list_pdf, students, department, to_file)
+
+
+def _render_student_list_pdf(students: list, department: str, to_file: bool = False) -> bytes | str:
+    if to_file:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"student_list_{department}_{timestamp}.pdf"
+        output = f"/tmp/{filename}"
+    else:
+        output = io.BytesIO()
     
     # Create PDF
-    doc = SimpleDocTemplate(filepath, pagesize=A4)
+    doc = SimpleDocTemplate(output, pagesize=A4)
     elements = []
     
-    # Styles
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#1e40af'),
-        spaceAfter=30,
-        alignment=TA_CENTER
-    )
-    
     # Title
-    title = Paragraph(f"Student List - {department} Department", title_style)
+    title = Paragraph(f"Student List - {department} Department", _TITLE_STYLE)
     elements.append(title)
     elements.append(Spacer(1, 0.2*inch))
     
@@ -166,52 +203,37 @@ async def generate_student_list_pdf(students: list, department: str) -> str:
     report_info = Paragraph(
         f"Generated on: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}<br/>"
         f"Total Students: {len(students)}",
-        styles['Normal']
+        _STYLES['Normal']
     )
     elements.append(report_info)
     elements.append(Spacer(1, 0.3*inch))
     
     if len(students) == 0:
-        no_data = Paragraph("No students found in this department.", styles['Normal'])
+        no_data = Paragraph("No students found in this department.", _STYLES['Normal'])
         elements.append(no_data)
     else:
         # Table data
-        table_data = [['S.No', 'Name', 'Email', 'Roll Number', 'CGPA', 'Skills', 'Status']]
-        
-        for idx, student in enumerate(students, 1):
-            skills_str = ', '.join(student.get('skills', [])[:3])
-            if len(student.get('skills', [])) > 3:
-                skills_str += '...'
-            
-            table_data.append([
+        header = ['S.No', 'Name', 'Email', 'Roll Number', 'CGPA', 'Skills', 'Status']
+        table_data = [header] + [
+            [
                 str(idx),
                 student.get('name', 'N/A'),
                 student.get('email', 'N/A'),
                 student.get('roll_number', 'N/A'),
                 str(student.get('cgpa', 'N/A')),
-                skills_str or 'N/A',
+                _fmt_skills(tuple(student.get('skills', []))),
                 'Approved' if student.get('is_approved') else 'Pending'
-            ])
+            ]
+            for idx, student in enumerate(students, 1)
+        ]
         
         # Create table with adjusted widths
         table = Table(table_data, colWidths=[0.5*inch, 1.3*inch, 1.5*inch, 1*inch, 0.7*inch, 1.8*inch, 0.8*inch])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3b82f6')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 9),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 8),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f3f4f6')])
-        ]))
+        table.setStyle(_STUDENT_LIST_TABLE_STYLE)
         
         elements.append(table)
     
     # Build PDF
     doc.build(elements)
     
-    return filepath
+    return output if to_file else output.getvalue()
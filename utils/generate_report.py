@@ -1,20 +1,30 @@
-import pandas as pd
-from openpyxl import Workbook
+import xlsxwriter
+import asyncio
 from datetime import datetime
-import os
 
 async def generate_excel_report(data: list, department: str) -> str:
     """
     Generate Excel report for placement data
     """
-    df = pd.DataFrame(data)
-    
+    # xlsxwriter writes synchronously, so keep it off the event loop
+    return await asyncio.to_thread(_write_excel_report, data, department)
+
+
+def _write_excel_report(data: list, department: str) -> str:
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f"placement_report_{department}_{timestamp}.xlsx"
     filepath = f"/tmp/{filename}"
     
-    # Create Excel writer
-    with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
-        df.to_excel(writer, sheet_name='Placements', index=False)
+    # constant_memory flushes each row to disk once written, so memory stays
+    # flat however many rows the report has
+    workbook = xlsxwriter.Workbook(filepath, {'constant_memory': True})
+    worksheet = workbook.add_worksheet('Placements')
+    
+    headers = list(data[0].keys()) if data else []
+    worksheet.write_row(0, 0, headers)
+    for row_idx, row in enumerate(data, 1):
+        worksheet.write_row(row_idx, 0, [row.get(h, '') for h in headers])
+    
+    workbook.close()
     
     return filepath
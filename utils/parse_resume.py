@@ -1,6 +1,9 @@
+import asyncio
 import os
+import re
 from dotenv import load_dotenv
 import pdfplumber
+import pypdfium2 as pdfium
 from docx import Document
 from emergentintegrations.llm.chat import LlmChat, UserMessage, FileContentWithMimeType
 
@@ -8,20 +11,70 @@ load_dotenv()
 
 EMERGENT_KEY = os.environ.get('EMERGENT_LLM_KEY', '')
 
-async def parse_resume_with_ai(file_path: str, mime_type: str):
+# Placeholder for fields the basic (non-AI) extraction can't fill
+NOT_EXTRACTED = "Not extracted"
+
+# Skills looked for by the basic extraction fallback
+COMMON_SKILLS = [
+    "Python", "Java", "JavaScript", "C++", "React", "Angular", "Vue",
+    "Node.js", "Django", "Flask", "FastAPI", "SQL", "MongoDB", "PostgreSQL",
+    "AWS", "Azure", "Docker", "Kubernetes", "Git", "Machine Learning",
+    "Data Science", "HTML", "CSS", "TypeScript", "Communication", "Leadership"
+]
+
+# One pass over the resume text finds every skill; lookarounds instead of \b
+# so skills ending in symbols (C++, Node.js) still match as whole words
+_SKILL_RE = re.compile(
+    r'(?<!\w)(' + '|'.join(re.escape(skill) for skill in COMMON_SKILLS) + r')(?!\w)',
+    re.IGNORECASE
+)
+_SKILL_CANON = {skill.lower(): skill for skill in COMMON_SKILLS}
+
+def _find_common_skills(text: str) -> list:
     """
-    Parse resume using AI to extract skills, education, and experience
+    Simple skill extraction from text, in COMMON_SKILLS order
     """
+    matched = {_SKILL_CANON[m.lower()] for m in _SKILL_RE.findall(text)}
+    return [skill for skill in COMMON_SKILLS if skill in matched]
+
+def _extract_pdf_text(file_path: str) -> str:
+    """
+    Extract PDF text with PDFium, falling back to pdfplumber when it finds none
+    """
+    try:
+        pdf = pdfium.PdfDocument(file_path)
+        try:
+            # PDFium ends lines with \r\n; normalize to match pdfplumber's output
+            text = "\n".join(page.get_textpage().get_text_range() for page in pdf).replace("\r\n", "\n")
+        finally:
+            pdf.close()
+    except pdfium.PdfiumError:
+        text = ""
     
-    # First extract text using traditional methods
-    text = ""
-    if mime_type == "application/pdf":
+    if not text.strip():
         with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                text += page.extract_text() or ""
-    elif mime_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
+            text = "".join(page.extract_text() or "" for page in pdf.pages)
+    return text
+
+def _extract_text(file_path: str, mime_type: str) -> str:
+    """
+    Extract plain text from a PDF or DOCX resume
+    """
+    if mime_type == "application/pdf":
+        return _extract_pdf_text(file_path)
+    if mime_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
         doc = Document(file_path)
-        text = "\n".join([para.text for para in doc.paragraphs])
+        return "\n".join([para.text for para in doc.paragraphs])
+    return ""
+
+async def parse_resume_with_ai(file_path: str, mime_type: str):
+    """
+    Parse resume using AI to extract skills, education, and experience
+    """
+    
+    # First extract text using traditional methods; parsing is synchronous,
+    # so keep it off the event loop
+    text = await asyncio.to_thread(_extract_text, file_path, mime_type)
     
     # Use Gemini with file attachment for better parsing
     try:
@@ -84,20 +137,10 @@ SUMMARY: brief summary"""
         # Fallback to basic text extraction
         print(f"AI parsing failed: {str(e)}, using basic extraction")
         
-        # Simple skill extraction from text
-        common_skills = [
-            "Python", "Java", "JavaScript", "C++", "React", "Angular", "Vue",
-            "Node.js", "Django", "Flask", "FastAPI", "SQL", "MongoDB", "PostgreSQL",
-            "AWS", "Azure", "Docker", "Kubernetes", "Git", "Machine Learning",
-            "Data Science", "HTML", "CSS", "TypeScript", "Communication", "Leadership"
-        ]
-        
-        found_skills = [skill for skill in common_skills if skill.lower() in text.lower()]
-        
         return {
             "text": text,
-            "skills": found_skills,
-            "education": "Not extracted",
-            "experience": "Not extracted",
+            "skills": _find_common_skills(text),
+            "education": NOT_EXTRACTED,
+            "experience": NOT_EXTRACTED,
             "summary": text[:200] if len(text) > 200 else text
         }
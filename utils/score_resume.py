@@ -1,47 +1,99 @@
+from functools import lru_cache
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
 
-async def score_resume(
-    resume_text: str,
+# Job descriptions shorter than this carry too little text for TF-IDF to add signal
+MIN_JD_WORDS = 5
+
+@lru_cache(maxsize=512)
+def _fit_jd(job_description: str):
+    """
+    Fit a TF-IDF vectorizer on a job description once and reuse it for every applicant
+    """
+    vectorizer = TfidfVectorizer()
+    jd_vector = vectorizer.fit_transform([job_description])
+    return vectorizer, jd_vector
+
+@lru_cache(maxsize=4096)
+def _lower_skills(skills: tuple) -> frozenset:
+    return frozenset(s.lower() for s in skills)
+
+def normalize_skills(skills) -> frozenset:
+    """
+    Lowercased skill set, built once per distinct skill list and reused across scoring calls
+    """
+    if isinstance(skills, frozenset):
+        return skills
+    return _lower_skills(tuple(skills or ()))
+
+async def score_resumes_batch(
+    resume_texts: list,
     student_skills: list,
-    student_cgpa: float,
+    student_cgpas: list,
     job_description: str,
     required_skills: list,
     min_cgpa: float
-) -> float:
+) -> list:
     """
-    Score resume using TF-IDF + Cosine Similarity + CGPA weighting
+    Score several applicants' resumes against one drive using TF-IDF + Cosine Similarity + CGPA weighting.
+    Pass required_skills as the drive's list; student_skills may be lists or normalize_skills sets.
     """
     
-    # Text similarity score (60% weight)
-    text_score = 0
-    if resume_text and job_description:
+    # Text similarity score (60% weight), one sparse product for the applicants
+    # that have resume text; None when the JD is too short to compare against
+    text_scores = None
+    if job_description and len(job_description.split()) >= MIN_JD_WORDS:
         try:
-            vectorizer = TfidfVectorizer()
-            vectors = vectorizer.fit_transform([resume_text, job_description])
-            similarity = cosine_similarity(vectors[0:1], vectors[1:2])[0][0]
-            text_score = similarity * 60
+            vectorizer, jd_vector = _fit_jd(job_description)
+            text_scores = np.zeros(len(resume_texts))
+            with_text = [i for i, text in enumerate(resume_texts) if text]
+            if with_text:
+                resume_vectors = vectorizer.transform([resume_texts[i] for i in with_text])
+                text_scores[with_text] = cosine_similarity(resume_vectors, jd_vector).ravel() * 60
         except:
-            text_score = 0
+            text_scores = None
     
     # Skills match score (30% weight)
-    skills_score = 0
-    if required_skills and student_skills:
-        matched_skills = set([s.lower() for s in student_skills]) & set([s.lower() for s in required_skills])
-        skills_score = (len(matched_skills) / len(required_skills)) * 30 if len(required_skills) > 0 else 0
+    skills_scores = np.zeros(len(resume_texts))
+    if required_skills:
+        required = normalize_skills(required_skills)
+        matched_counts = np.array([
+            len(normalize_skills(skills) & required) if skills else 0
+            for skills in student_skills
+        ])
+        # Divide by the drive's skill list as written, not the deduplicated set,
+        # so case-duplicates like "Python" and "python" still count separately
+        skills_scores = matched_counts / len(required_skills) * 30
     
-    # CGPA score (10% weight)
-    cgpa_score = 0
-    if student_cgpa >= min_cgpa:
-        # Normalize CGPA to 0-10 scale
-        cgpa_normalized = (student_cgpa / 10.0) * 10
-        cgpa_score = cgpa_normalized
-    else:
-        # Penalty for not meeting minimum CGPA
-        cgpa_score = (student_cgpa / min_cgpa) * 5 if min_cgpa > 0 else 0
+    # CGPA score (10% weight): CGPA on its 0-10 scale when the minimum is met,
+    # otherwise a penalty proportional to how far below the minimum it falls
+    cgpas = np.asarray(student_cgpas, dtype=float)
+    below_min_scores = cgpas / min_cgpa * 5 if min_cgpa > 0 else np.zeros(len(cgpas))
+    cgpa_scores = np.where(cgpas >= min_cgpa, cgpas, below_min_scores)
     
-    total_score = text_score + skills_score + cgpa_score
+    if text_scores is None:
+        # Without a text score, stretch skills and CGPA (40 points) over the full
+        # range so scores stay comparable with drives that have a full JD
+        total_scores = (skills_scores + cgpa_scores) * (100 / 40)
+    else:
+        total_scores = text_scores + skills_scores + cgpa_scores
     
     # Normalize to 0-100
-    return round(min(100, max(0, total_score)), 2)
+    return np.round(np.clip(total_scores, 0, 100), 2).tolist()
+
+async def score_resume(
+    resume_text: str,
+    student_skills: list,
+    student_cgpa: float,
+    job_description: str,
+    required_skills: list,
+    min_cgpa: float
+) -> float:
+    """
+    Score resume using TF-IDF + Cosine Similarity + CGPA weighting
+    """
+    scores = await score_resumes_batch(
+        [resume_text], [student_skills], [student_cgpa], job_description, required_skills, min_cgpa
+    )
+    return scores[0]
@@ -1,37 +1,89 @@
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+import asyncio
+import aiosmtplib
+from email.message import EmailMessage
+import logging
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 SMTP_EMAIL = os.environ.get('SMTP_EMAIL', '')
 SMTP_PASSWORD = os.environ.get('SMTP_PASSWORD', '')
 SMTP_HOST = os.environ.get('SMTP_HOST', 'smtp.gmail.com')
 SMTP_PORT = int(os.environ.get('SMTP_PORT', 587))
 
+# One authenticated SMTP session is opened lazily and reused for every send;
+# SMTP is a sequential protocol, so sends take turns on it
+_smtp = None
+_smtp_lock = asyncio.Lock()
+
+def _build_message(to_email: str, subject: str, body: str) -> EmailMessage:
+    # Plain-text bodies go out as a single text/plain part, no multipart container
+    message = EmailMessage()
+    message['From'] = SMTP_EMAIL
+    message['To'] = to_email
+    message['Subject'] = subject
+    message.set_content(body)
+    return message
+
+async def _get_smtp() -> aiosmtplib.SMTP:
+    global _smtp
+    if _smtp is None or not _smtp.is_connected:
+        # Connect to SMTP server with encryption; only keep the session once logged in
+        server = aiosmtplib.SMTP(hostname=SMTP_HOST, port=SMTP_PORT, start_tls=True)
+        await server.connect()
+        try:
+            await server.login(SMTP_EMAIL, SMTP_PASSWORD)
+        except Exception:
+            server.close()
+            raise
+        _smtp = server
+    return _smtp
+
+async def _send_with_reconnect(message):
+    try:
+        await (await _get_smtp()).send_message(message)
+    except aiosmtplib.SMTPServerDisconnected:
+        # The server closed an idle session; reconnect once and retry
+        await close_smtp()
+        await (await _get_smtp()).send_message(message)
+
+async def send_emails(messages: list) -> list:
+    """
+    Send (to_email, subject, body) messages over the shared SMTP session.
+    A failed message is logged and skipped; returns True or the raised
+    exception for each message, in order.
+    """
+    results = []
+    async with _smtp_lock:
+        for to_email, subject, body in messages:
+            try:
+                await _send_with_reconnect(_build_message(to_email, subject, body))
+                results.append(True)
+            except Exception as e:
+                logger.error("Error sending email to %s: %s", to_email, e)
+                results.append(e)
+    return results
+
 async def send_email(to_email: str, subject: str, body: str):
     """
     Send email using SMTP with encryption
     """
-    try:
-        # Create message
-        message = MIMEMultipart()
-        message['From'] = SMTP_EMAIL
-        message['To'] = to_email
-        message['Subject'] = subject
-        
-        # Add body
-        message.attach(MIMEText(body, 'plain'))
-        
-        # Connect to SMTP server
-        with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
-            server.starttls()  # Enable encryption
-            server.login(SMTP_EMAIL, SMTP_PASSWORD)
-            server.send_message(message)
-        
-        return True
-    except Exception as e:
-        print(f"Error sending email: {str(e)}")
-        raise e
+    result = (await send_emails([(to_email, subject, body)]))[0]
+    if isinstance(result, Exception):
+        raise result
+    return True
+
+async def close_smtp():
+    """
+    Close the shared SMTP session, if one is open
+    """
+    global _smtp
+    if _smtp is not None and _smtp.is_connected:
+        try:
+            await _smtp.quit()
+        except aiosmtplib.SMTPException:
+            _smtp.close()
+    _smtp = None